@@ -0,0 +1,177 @@
+"""
+Séries semanais de commits em arrays NumPy alinhados por semana.
+
+Cada WeeklyActivity guarda o timestamp da primeira semana (domingo 00:00 UTC,
+como nas estatísticas do GitHub) e os totais semanais. Assim a soma de vários
+repos respeita as datas em vez de só emparelhar posições, e a série pode ser
+gravada num formato binário compacto (to_bytes / from_bytes).
+"""
+
+import base64
+import struct
+
+import numpy as np # type:ignore
+
+WEEK = 7 * 24 * 3600
+
+# magic, primeira semana, quantidade de semanas, bytes por valor
+_HEADER = struct.Struct("<4sqIB")
+_MAGIC = b"WKA1"
+
+
+def week_start(timestamp):
+    """Início (domingo 00:00 UTC) da semana do timestamp, igual às semanas das estatísticas do GitHub."""
+    # 01/01/1970 foi uma quinta-feira: o domingo anterior está 4 dias antes
+    return int(timestamp - (timestamp + 4 * 24 * 3600) % WEEK)
+
+
+class WeeklyActivity:
+    __slots__ = ("start", "counts")
+
+    def __init__(self, start, counts):
+        self.start = int(start)
+        self.counts = np.asarray(counts, dtype=np.int64)
+
+    @classmethod
+    def from_stats(cls, data):
+        """A partir da resposta de stats/commit_activity ([{"week", "total", "days"}, ...])."""
+        if not data:
+            return cls(0, [])
+        return cls(data[0]["week"], [week["total"] for week in data])
+
+    @property
+    def end(self):
+        """Timestamp da última semana (ou start, se a série estiver vazia)."""
+        return self.start + max(len(self.counts) - 1, 0) * WEEK
+
+    @property
+    def weeks(self):
+        return self.start + np.arange(len(self.counts), dtype=np.int64) * WEEK
+
+    def __len__(self):
+        return len(self.counts)
+
+    def tolist(self):
+        return self.counts.tolist()
+
+    @classmethod
+    def merge(cls, series, end=None):
+        """
+        Soma várias séries semana a semana, alinhadas pela data, numa única operação.
+        O resultado cobre da primeira à última semana de todas (ou até `end`, se for depois).
+        """
+        series = [s for s in series if len(s)]
+        if not series:
+            return cls(end or 0, [])
+
+        starts = np.fromiter((s.start for s in series), dtype=np.int64, count=len(series))
+        lengths = np.fromiter((len(s) for s in series), dtype=np.int64, count=len(series))
+        first = int(starts.min())
+        last = int((starts + (lengths - 1) * WEEK).max())
+        if end is not None:
+            last = max(last, int(end))
+
+        # Posição de cada valor no resultado: deslocamento da série + índice dentro dela
+        offsets = (starts - first) // WEEK
+        positions = np.repeat(offsets - np.cumsum(lengths) + lengths, lengths) + np.arange(int(lengths.sum()))
+        values = np.concatenate([s.counts for s in series])
+        size = (last - first) // WEEK + 1
+        counts = np.bincount(positions, weights=values, minlength=size).astype(np.int64)
+        return cls(first, counts)
+
+    # -----------------------------
+    # SERIALIZAÇÃO
+    # -----------------------------
+
+    def to_bytes(self):
+        """Cabeçalho de 17 bytes + valores no menor inteiro sem sinal que comporte o máximo."""
+        peak = int(self.counts.max()) if len(self.counts) else 0
+        dtype = next(t for t in (np.uint8, np.uint16, np.uint32, np.uint64) if peak <= np.iinfo(t).max)
+        data = self.counts.astype(np.dtype(dtype).newbyteorder("<")).tobytes()
+        return _HEADER.pack(_MAGIC, self.start, len(self.counts), np.dtype(dtype).itemsize) + data
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, start, length, itemsize = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError("Formato de atividade semanal desconhecido")
+        dtype = np.dtype(f"<u{itemsize}")
+        counts = np.frombuffer(data, dtype=dtype, count=length, offset=_HEADER.size)
+        return cls(start, counts.astype(np.int64))
+
+    def to_base64(self):
+        """to_bytes em texto, para guardar em JSON (ex: snapshots no DiskCache)."""
+        return base64.b64encode(self.to_bytes()).decode("ascii")
+
+    @classmethod
+    def from_base64(cls, text):
+        return cls.from_bytes(base64.b64decode(text))
+
+
+# -----------------------------
+# MÉTRICAS
+# -----------------------------
+
+def right_aligned(histories, width):
+    """
+    Matriz (perfis x width) com as últimas `width` semanas de cada histórico,
+    alinhadas à direita, e quantas semanas de cada um estão preenchidas.
+    """
+    matrix = np.zeros((len(histories), width), dtype=np.int64)
+    lengths = np.zeros(len(histories), dtype=np.int64)
+    for i, history in enumerate(histories):
+        tail = np.asarray(history[-width:], dtype=np.int64)
+        if len(tail):
+            matrix[i, width - len(tail):] = tail
+            lengths[i] = len(tail)
+    return matrix, lengths
+
+
+def activity_metrics(matrix, lengths, windows=(4, 12, 52), rolling=4, trend=12):
+    """
+    Métricas de atividade de vários perfis de uma vez, sobre a matriz de right_aligned
+    (com largura de pelo menos a maior janela, `rolling` e `trend`). Cada janela usa
+    só as semanas disponíveis do perfil: um histórico de 5 semanas tem a média de
+    12 semanas calculada sobre as 5. Retorna {nome: array por perfil}.
+    """
+    n, width = matrix.shape
+    column = np.arange(width)
+    # Semanas que existem no histórico de cada perfil (o resto é preenchimento)
+    available = column >= (width - lengths)[:, None]
+    active = (matrix > 0) & available
+    result = {}
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for w in windows:
+            in_window = column >= width - w
+            weeks = np.minimum(lengths, w)
+            total = np.where(in_window, matrix, 0).sum(axis=1)
+            result[f"avg_commits_{w}w"] = np.where(weeks == 0, 0.0, total / weeks)
+            result[f"active_ratio_{w}w"] = np.where(weeks == 0, 0.0, (active & in_window).sum(axis=1) / weeks)
+
+        # Maior média móvel de `rolling` semanas inteiramente dentro do histórico disponível
+        cumulative = np.concatenate([np.zeros((n, 1), dtype=np.int64), matrix.cumsum(axis=1)], axis=1)
+        sums = cumulative[:, rolling:] - cumulative[:, :-rolling]  # janela que começa em cada coluna
+        complete = column[:width - rolling + 1] >= (width - lengths)[:, None]
+        best = np.where(complete, sums, -1).max(axis=1, initial=-1)
+        # Históricos mais curtos que a janela ficam com a média do que existe
+        fallback = np.where(lengths == 0, 0.0, matrix.sum(axis=1) / lengths)
+        result[f"peak_rolling_avg_{rolling}w"] = np.where(best >= 0, best / rolling, fallback)
+
+        # Sequências de semanas com commit: tamanho da sequência que termina em cada semana
+        runs = np.cumsum(active, axis=1)
+        runs = runs - np.maximum.accumulate(np.where(active, 0, runs), axis=1)
+        result["current_streak"] = runs[:, -1]
+        result["longest_streak"] = runs.max(axis=1, initial=0)
+
+        # Inclinação (mínimos quadrados) dos commits semanais nas últimas `trend` semanas
+        points = np.minimum(lengths, trend)
+        mask = column >= (width - points)[:, None]
+        x = np.where(mask, column, 0).astype(float)
+        y = np.where(mask, matrix, 0).astype(float)
+        sx, sy = x.sum(axis=1), y.sum(axis=1)
+        sxy, sxx = (x * y).sum(axis=1), (x * x).sum(axis=1)
+        denominator = points * sxx - sx * sx
+        result["trend_slope"] = np.where(points < 2, 0.0, (points * sxy - sx * sy) / denominator)
+
+    return result
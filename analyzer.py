@@ -1,10 +1,29 @@
+import metrics
+
+
 class SkillAnalyzer:
     """
     Analisa habilidades técnicas do usuário com base em métricas do GitHub.
     A análise fica mais robusta e menos superficial.
     """
 
-    def analyze(self, data):
+    def __init__(self, percentile_index=None, score_window=12, activity_windows=(4, 12, 52),
+                 rolling_window=4, trend_window=12):
+        # PercentileIndex opcional: posiciona o perfil em relação aos já analisados
+        self.percentile_index = percentile_index
+        # Semanas mais recentes usadas na nota de atividade
+        self.score_window = score_window
+        # Janelas (em semanas) das métricas detalhadas de atividade
+        self.activity_windows = tuple(activity_windows)
+        self.rolling_window = rolling_window
+        self.trend_window = trend_window
+
+    @metrics.timed("analyzer.analyze")
+    def analyze(self, data, key=None):
+        """
+        key identifica o perfil (ex: usuário do GitHub) no PercentileIndex: uma nova
+        análise do mesmo perfil substitui a anterior em vez de entrar de novo.
+        """
         languages = data["languages"]
         repos = data["repos"]              # lista completa dos repositórios
         commit_activity = data["activity"] # commits por semana
@@ -16,7 +35,7 @@ class SkillAnalyzer:
 
         final_score = (language_score * 0.4) + (activity_score * 0.3) + (project_score * 0.3)
 
-        return {
+        result = {
             "main_languages": self.get_main_languages(languages),
             "activity_score": activity_score,
             "project_score": project_score,
@@ -24,8 +43,124 @@ class SkillAnalyzer:
             "total_repos": total_repos,
             "final_skill_level": self.map_score_to_level(final_score),
             "final_score": round(final_score, 2),
+            "activity_metrics": self.activity_metrics([commit_activity])[0],
         }
 
+        if self.percentile_index is not None:
+            # Percentil em relação aos outros perfis; depois o perfil entra (ou é atualizado) na distribuição
+            key = key.strip().lower() if key else None
+            result["percentiles"] = self.percentile_index.percentiles(result, key)
+            self.percentile_index.add(result, key)
+
+        return result
+
+    @metrics.timed("analyzer.analyze_many")
+    def analyze_many(self, profiles):
+        """
+        Versão em lote de analyze: calcula as mesmas métricas para vários perfis
+        de uma vez, em colunas NumPy, e devolve um DataFrame (uma linha por perfil).
+        As operações seguem a mesma ordem do analyze, então os valores são idênticos.
+        """
+        import numpy as np # type:ignore
+        import pandas as pd # type:ignore
+
+        profiles = list(profiles)
+        n = len(profiles)
+
+        # Colunas de entrada, montadas numa única passada pelos perfis
+        lang_count = np.zeros(n, dtype=np.int64)
+        lang_total = np.zeros(n, dtype=np.int64)
+        lang_max = np.zeros(n, dtype=np.int64)
+        window = self.score_window
+        weeks = np.zeros((n, window), dtype=np.int64)  # últimas semanas, alinhadas à direita
+        weeks_len = np.zeros(n, dtype=np.int64)
+        total_repos = np.zeros(n, dtype=np.int64)
+        main_languages = []
+
+        all_repos = []
+
+        for i, data in enumerate(profiles):
+            languages = data["languages"]
+            if languages:
+                values = languages.values()
+                lang_count[i] = len(languages)
+                lang_total[i] = sum(values)
+                lang_max[i] = max(values)
+            main_languages.append(self.get_main_languages(languages))
+
+            tail = list(data["activity"][-window:])
+            if tail:
+                weeks[i, window - len(tail):] = tail
+                weeks_len[i] = len(tail)
+
+            repos = data["repos"]
+            total_repos[i] = len(repos)
+            all_repos.extend(repos)
+
+        # Perfil dono de cada repo e posição do repo dentro do perfil
+        repo_profile = np.repeat(np.arange(n), total_repos)
+        starts = np.cumsum(total_repos) - total_repos
+        repo_rank = np.arange(len(repo_profile)) - np.repeat(starts, total_repos)
+
+        def repo_column(field, default, dtype):
+            return np.fromiter((r.get(field, default) for r in all_repos), dtype=dtype, count=len(all_repos))
+
+        repo_size = repo_column("size", 0, np.int64)
+        repo_issues = repo_column("open_issues_count", 0, np.int64)
+        repo_readme = repo_column("has_readme", False, bool)
+        repo_tests = repo_column("has_tests", False, bool)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Linguagens
+            diversity_factor = np.minimum(lang_count / 5, 1)
+            depth_factor = lang_max / lang_total
+            language_score = np.where(lang_total == 0, 0.0, (0.6 * depth_factor + 0.4 * diversity_factor) * 10)
+
+            # Atividade
+            avg_commits = weeks.sum(axis=1) / weeks_len
+            active_weeks = (weeks > 0).sum(axis=1)
+            commit_score = np.minimum(avg_commits / 10, 1)
+            consistency = active_weeks / weeks_len
+            activity_score = np.where(weeks_len == 0, 0.0, (0.6 * consistency + 0.4 * commit_score) * 10)
+
+            # Projetos: nota de cada repo somando os critérios na mesma ordem do score_projects
+            per_repo = np.zeros(len(repo_profile))
+            per_repo = np.where(repo_size > 200, per_repo + 0.4, per_repo)
+            per_repo = np.where(repo_readme, per_repo + 0.2, per_repo)
+            per_repo = np.where(repo_tests, per_repo + 0.3, per_repo)
+            per_repo = np.where(repo_issues > 1, per_repo + 0.1, per_repo)
+
+            # Soma sequencial por perfil (repo 0, depois 1, ...) para reproduzir o arredondamento do loop.
+            # Ordenando por posição, cada fatia tem no máximo um repo por perfil.
+            order = np.argsort(repo_rank, kind="stable")
+            bounds = np.cumsum(np.bincount(repo_rank, minlength=1))
+            project_sum = np.zeros(n)
+            start = 0
+            for end in bounds:
+                at_rank = order[start:end]
+                project_sum[repo_profile[at_rank]] += per_repo[at_rank]
+                start = end
+            project_score = np.where(total_repos == 0, 0.0, np.minimum(project_sum / total_repos, 1) * 10)
+
+        final_score = (language_score * 0.4) + (activity_score * 0.3) + (project_score * 0.3)
+        levels = np.select(
+            [final_score <= 3, final_score <= 6.5],
+            ["Iniciante", "Intermediário"],
+            default="Avançado",
+        )
+
+        return pd.DataFrame({
+            "main_languages": main_languages,
+            "activity_score": activity_score,
+            "project_score": project_score,
+            "language_score": language_score,
+            "total_repos": total_repos,
+            "final_skill_level": levels,
+            # round do Python (e não np.round) para bater com analyze
+            "final_score": [round(float(x), 2) for x in final_score],
+            "activity_metrics": self.activity_metrics([data["activity"] for data in profiles]),
+        })
+
     # -----------------------------
     # MÉTRICAS DE ANÁLISE
     # -----------------------------
@@ -48,7 +183,7 @@ class SkillAnalyzer:
         if not commit_activity:
             return 0
         
-        weekly_commits = commit_activity[-12:]  # últimas 12 semanas
+        weekly_commits = commit_activity[-self.score_window:]  # últimas semanas (12 por padrão)
         avg_commits = sum(weekly_commits) / len(weekly_commits)
         active_weeks = len([w for w in weekly_commits if w > 0])
 
@@ -58,6 +193,25 @@ class SkillAnalyzer:
         return (0.6 * consistency + 0.4 * commit_score) * 10
 
 
+    def activity_metrics(self, histories):
+        """
+        Médias por janela, maior média móvel, sequências de semanas com commit e
+        tendência de cada histórico semanal, calculadas de uma vez em NumPy.
+        """
+        from activity import activity_metrics, right_aligned
+
+        width = max(*self.activity_windows, self.rolling_window, self.trend_window)
+        matrix, lengths = right_aligned(histories, width)
+        columns = activity_metrics(matrix, lengths, self.activity_windows, self.rolling_window, self.trend_window)
+
+        rows = [{} for _ in histories]
+        for name, values in columns.items():
+            integer = values.dtype.kind == "i"
+            for row, value in zip(rows, values.tolist()):
+                row[name] = value if integer else round(value, 3)
+        return rows
+
+
     def score_projects(self, repos):
         """Avalia qualidade dos projetos."""
         if not repos:
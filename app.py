@@ -1,8 +1,18 @@
+import os
+import threading
 import streamlit as st # type:ignore
+import metrics
+import render
 from github_collector import GitHubCollector
+from github_graphql_collector import GitHubGraphQLCollector
+from cache import DiskCache, HTTPCache
+from rate_limiter import RateLimitExceeded
 from analyzer import SkillAnalyzer
-from mentor_ai import MentorAI 
-import pandas as pd # type:ignore
+from mentor_ai import MentorAI, load_environment
+from pipeline import Pipeline
+from percentiles import PercentileIndex
+from jobs import JobQueue, JobQueueFull
+from llm_client import CircuitOpen, LLMTimeout
 
 st.set_page_config(
     page_title="Mentor IA de Carreira",
@@ -42,11 +52,260 @@ body {
     margin-top: 20px;
     margin-bottom: 20px; /* Adiciona espaço entre os cards */
 }
+
+/* Blocos das seções de resultado (render.py) */
+.card-cols {
+    display: flex;
+    gap: 16px;
+}
+
+.card-cols > div {
+    flex: 1;
+}
+
+.card-item {
+    padding: 10px 14px;
+    border-radius: 8px;
+    margin: 6px 0;
+}
+
+.card-item.success { background: #e8f5e8; color: #1e6b2f; }
+.card-item.warning { background: #fff3cd; color: #7a5a00; }
+.card-item.info { background: #e6f3ff; color: #0b4f8a; }
+
+.card-table {
+    width: 100%;
+    border-collapse: collapse;
+}
+
+.card-table th, .card-table td {
+    border-bottom: 1px solid #ddd;
+    padding: 6px 8px;
+    text-align: left;
+}
+
+.card-details {
+    border: 1px solid #ddd;
+    border-radius: 8px;
+    padding: 8px 14px;
+    margin: 8px 0;
+}
+
+.plan-card {
+    border-radius: 10px;
+    padding: 15px;
+    margin: 5px;
+}
 </style>
 """
 
 st.markdown(GLOBAL_CSS, unsafe_allow_html=True)
 
+# ============================
+# RECURSOS COMPARTILHADOS
+# ============================
+# Criados uma vez por processo e reaproveitados em todos os reruns e sessões.
+# O Gemini só é configurado na primeira chamada ao modelo.
+
+@st.cache_resource
+def get_http_cache():
+    return HTTPCache(".cache/github")
+
+@st.cache_resource
+def get_analyzer():
+    # Distribuição das notas de todos os perfis analisados, persistida em disco
+    return SkillAnalyzer(percentile_index=PercentileIndex(".cache/percentiles.jsonl"))
+
+@st.cache_resource
+def get_mentor():
+    # Respostas do Gemini ficam 7 dias no disco, até 500 entradas
+    return MentorAI(cache=DiskCache(".cache/mentor", max_entries=500, ttl=7 * 24 * 3600))
+
+@st.cache_resource
+def get_snapshots():
+    # Último snapshot de cada perfil: uma nova análise só busca a atividade dos repos com push novo
+    return DiskCache(".cache/snapshots", max_entries=5000, ttl=30 * 24 * 3600)
+
+def build_collector(username, http_cache, snapshots):
+    # GITHUB_BACKEND=graphql usa poucas consultas GraphQL (precisa de GITHUB_TOKEN)
+    if os.getenv("GITHUB_BACKEND", "rest").lower() == "graphql":
+        return GitHubGraphQLCollector(username)
+    # GITHUB_API_URL aponta para outra API REST compatível (ex: GitHub Enterprise)
+    api_url = os.getenv("GITHUB_API_URL", "https://api.github.com")
+    return GitHubCollector(username, cache=http_cache, snapshots=snapshots, api_url=api_url)
+
+@st.cache_resource
+def get_job_queue():
+    # As análises rodam fora do script, em JOB_WORKERS workers para o processo inteiro.
+    # Os recursos são resolvidos aqui porque os workers não têm contexto do Streamlit.
+    load_environment()
+    http_cache, snapshots = get_http_cache(), get_snapshots()
+    analyzer, ai = get_analyzer(), get_mentor()
+
+    def build_pipeline(username, objetivo):
+        collector = build_collector(username, http_cache, snapshots)
+
+        # O roadmap só depende do objetivo: começa junto com a coleta do GitHub.
+        # As respostas do Gemini chegam em streaming, campo a campo.
+        pipeline = Pipeline(max_workers=3)
+        pipeline.add("roadmap", lambda: ai.stream_roadmap(objetivo))
+        pipeline.add("collect", collector.collect_profile_data)
+        pipeline.add("analyze", lambda data: analyzer.analyze(data, key=username), deps=("collect",))
+        pipeline.add("feedback", ai.stream_profile, deps=("analyze",))
+        return pipeline
+
+    return JobQueue(build_pipeline, max_workers=int(os.getenv("JOB_WORKERS", "4")))
+
+@st.cache_resource
+def start_prewarm():
+    # MENTOR_PREWARM_GOALS="Backend Python,Data Science" gera esses roadmaps uma vez por processo
+    load_environment()
+    goals = [g for g in os.getenv("MENTOR_PREWARM_GOALS", "").split(",") if g.strip()]
+    if goals:
+        threading.Thread(target=get_mentor().prewarm_roadmaps, args=(goals,), daemon=True).start()
+    return goals
+
+@st.cache_resource
+def start_metrics_server():
+    # METRICS_PORT=9100 expõe as métricas em http://localhost:9100/metrics (formato Prometheus)
+    load_environment()
+    port = os.getenv("METRICS_PORT")
+    return metrics.serve(int(port), os.getenv("METRICS_HOST", "127.0.0.1")) if port else None
+
+start_prewarm()
+start_metrics_server()
+
+# ============================
+# RENDERIZAÇÃO DAS SEÇÕES
+# ============================
+# Cada seção é um único bloco de HTML montado pelos templates de render.py.
+# Durante o streaming a view guarda os campos que já chegaram do Gemini e
+# reescreve o bloco inteiro no seu espaço a cada evento.
+
+SECTIONS = {
+    "feedback": render.feedback_html,
+    "roadmap": render.roadmap_html,
+}
+
+# Resultados guardados por sessão (os mais recentes), para reruns e reenvios do mesmo pedido
+MAX_SESSION_RESULTS = 5
+
+# st.fragment redesenha só a seção em interações dentro dela (experimental nas versões antigas)
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda fn: fn)
+
+
+class SectionView:
+    def __init__(self, build_html):
+        self.build_html = build_html
+        self.data = {}
+        self.placeholder = st.empty()
+
+    def on_event(self, path, value):
+        field = path[0]
+        if len(path) == 1:
+            self.data[field] = value
+        else:
+            items = self.data.setdefault(field, [])
+            if path[1] == len(items):
+                items.append(value)
+        self.placeholder.markdown(self.build_html(self.data), unsafe_allow_html=True)
+
+    def finish(self, data):
+        self.placeholder.markdown(self.build_html(data, final=True), unsafe_allow_html=True)
+
+
+@fragment
+def render_section(name, data):
+    st.markdown(SECTIONS[name](data, final=True), unsafe_allow_html=True)
+
+
+@fragment
+def render_timings(breakdown):
+    with st.expander("⏱️ Tempo por etapa", expanded=True):
+        st.table(breakdown)
+
+
+def render_results(results, show_timings):
+    """Desenha um resultado já pronto da sessão, sem voltar ao job nem às APIs."""
+    st.write("---")
+    for name in SECTIONS:
+        if name in results:
+            render_section(name, results[name])
+    if show_timings and results.get("timings"):
+        render_timings(results["timings"])
+
+
+def remember_results(key, results):
+    stored = st.session_state.setdefault("results", {})
+    stored.pop(key, None)
+    stored[key] = results
+    while len(stored) > MAX_SESSION_RESULTS:
+        del stored[next(iter(stored))]
+
+
+def render_job(job, show_timings):
+    """Acompanha o job e desenha cada seção conforme os eventos chegam (também em reruns)."""
+    # Cada seção é desenhada no seu espaço assim que os dados ficam prontos
+    status = st.empty()
+    st.write("---")
+    areas = {name: st.container() for name in SECTIONS}
+    views = {}
+
+    progress = {
+        "collect": "🧠 Analisando perfil técnico...",
+        "analyze": "🤖 Gerando insights com IA (Gemini)...",
+    }
+    remaining = set(SECTIONS)
+
+    cursor = 0
+    while True:
+        if job.status == "queued":
+            status.info("⏳ Análise na fila, aguardando um worker livre...")
+        elif cursor == 0:
+            status.info("🔍 Coletando dados do GitHub e 🤖 gerando o roadmap com IA (Gemini)...")
+
+        events, cursor = job.wait(cursor, timeout=0.5)
+        for stage, event, value in events:
+            if stage in areas:
+                with areas[stage]:
+                    if stage not in views:
+                        views[stage] = SectionView(SECTIONS[stage])
+                    if event == "partial":
+                        views[stage].on_event(*value)
+                    else:
+                        views[stage].finish(value)
+
+            if event != "done":
+                continue
+            remaining.discard(stage)
+            if not remaining:
+                status.empty()
+            elif stage in progress:
+                status.info(progress[stage])
+
+        if job.finished and cursor == len(job.events):
+            break
+
+    if isinstance(job.error, (RateLimitExceeded, CircuitOpen, LLMTimeout)):
+        status.empty()
+        st.warning(f"⏳ {job.error}")
+    elif job.error is not None:
+        status.empty()
+        st.error(f"⚠️ Erro ao processar. Verifique o nome de usuário ou a API Key: {str(job.error)}")
+
+    timings = job.trace.breakdown() if job.trace is not None else []
+    if show_timings and timings:
+        render_timings(timings)
+
+    if job.error is None:
+        # Os próximos reruns (e um novo envio do mesmo pedido) desenham direto da sessão
+        remember_results(job.key, {**{name: job.results[name] for name in SECTIONS}, "timings": timings})
+        st.session_state.pop("job_id", None)
+
+    # METRICS_FILE grava as métricas após cada análise (ex: textfile collector do node_exporter)
+    if os.getenv("METRICS_FILE"):
+        metrics.write_prometheus(os.getenv("METRICS_FILE"))
+
 # ============================
 # TÍTULO
 # ============================
@@ -66,6 +325,8 @@ with st.form("form"):
         placeholder="ex: Backend Python, Data Science, Full Stack, DevOps..."
     )
 
+    show_timings = st.checkbox("⏱️ Mostrar tempo gasto em cada etapa")
+
     submitted = st.form_submit_button("Gerar Análise ➜")
 
 # ============================
@@ -81,183 +342,25 @@ if submitted:
         st.error("Por favor, insira um objetivo de carreira.")
         st.stop()
 
-    try:
-        # Inicialização e Coleta de Dados
-        st.info("🔍 Coletando dados do GitHub...")
-        collector = GitHubCollector(username)
-        raw_data = collector.collect_profile_data()
-
-        st.info("🧠 Analisando perfil técnico...")
-        analyzer = SkillAnalyzer()
-        analyzed = analyzer.analyze(raw_data)
-
-        st.info("🤖 Gerando insights com IA (Gemini)...")
-        ai = MentorAI()
-        
-        # OBTENDO DADOS JSON
-        feedback_data = ai.analyze_profile(analyzed) 
-        roadmap_data = ai.generate_roadmap(objetivo) 
-
-        # ============================
-        # EXIBIR RESULTADOS
-        # ============================
-        st.write("---")
-        st.markdown("<h2>🧠 Análise do Mentor IA</h2>", unsafe_allow_html=True)
-        
-        # -----------------------------
-        # 1. RESUMO GERAL
-        # -----------------------------
-        st.markdown("<div class='json-card'>", unsafe_allow_html=True)
-        st.subheader("📌 Resumo Geral do Perfil")
-        st.write(feedback_data.get("resumo_geral", "Resumo não encontrado."))
-        st.markdown("</div>", unsafe_allow_html=True)
-
-        # -----------------------------
-        # 2. FORÇAS E PONTOS A MELHORAR
-        # -----------------------------
-        col1, col2 = st.columns(2)
-
-        with col1:
-            st.markdown("<div class='json-card'>", unsafe_allow_html=True)
-            st.subheader("💡 Forças Técnicas")
-            for item in feedback_data.get("forcas_tecnicas", []):
-                 st.success(f"✅ {item}")
-            st.markdown("</div>", unsafe_allow_html=True)
-
-        with col2:
-            st.markdown("<div class='json-card'>", unsafe_allow_html=True)
-            st.subheader("⚠️ Pontos a Melhorar")
-            for item in feedback_data.get("pontos_melhorar", []):
-                st.warning(f"❗ {item}")
-            st.markdown("</div>", unsafe_allow_html=True)
-        
-        # -----------------------------
-        # 3. SUGESTÕES DE CURTO PRAZO
-        # -----------------------------
-        st.markdown("<div class='json-card'>", unsafe_allow_html=True)
-        st.subheader("🚀 Sugestões de Curto Prazo (7-30 dias)")
-        for item in feedback_data.get("sugestoes_curto_prazo", []):
-            st.info(f"👉 {item}")
-        st.markdown("</div>", unsafe_allow_html=True)
-
-        # -----------------------------
-        # 4. CAMINHOS DE CARREIRA
-        # -----------------------------
-        st.markdown("<h3>🎯 Possíveis Caminhos de Carreira</h3>", unsafe_allow_html=True)
-        
-        caminhos = feedback_data.get("caminhos_carreira", [])
-        
-        # expander para cada caminho de carreira
-        for i, caminho in enumerate(caminhos):
-            title = caminho.get('titulo', f'Caminho {i+1}')
-            compatibilidade = caminho.get('compatibilidade', 'Nível não especificado')
-            
-            with st.expander(f"**{title}** - Compatibilidade: {compatibilidade}"):
-                st.markdown(f"**O que precisa ser desenvolvido:** {caminho.get('desenvolvimento_necessario', 'N/A')}")
-                st.markdown(f"**Oportunidades no Mercado:** {caminho.get('oportunidades', 'N/A')}")
-        
-        st.write("---")
-        
-        # ============================
-        # EXIBIR ROADMAP
-        # ============================
-        st.markdown("<h2>🗺️ Roadmap Personalizado</h2>", unsafe_allow_html=True)
-
-        # -----------------------------
-        # 1. FUNDAMENTOS
-        # -----------------------------
-        with st.container():
-            st.markdown("<div class='json-card' style='background-color:#e6f3ff; border-left: 5px solid #007bff;'>", unsafe_allow_html=True)
-            st.subheader("✅ Fundamentos Essenciais")
-            for f in roadmap_data.get('fundamentos_essenciais', []):
-                st.markdown(f"• **{f}**")
-            st.markdown("</div>", unsafe_allow_html=True)
-
-        # -----------------------------
-        # 2. FERRAMENTAS ESSENCIAIS
-        # -----------------------------
-        with st.container():
-            st.markdown("<div class='json-card'>", unsafe_allow_html=True)
-            st.subheader("🛠️ Ferramentas, Linguagens e Frameworks Essenciais")
-            if roadmap_data.get("ferramentas_essenciais"):
-                df = pd.DataFrame(roadmap_data["ferramentas_essenciais"])
-                df.columns = ["Nome", "Prioridade", "Quando Aprender", "Conexão Mercado"]
-                st.dataframe(df, use_container_width=True, hide_index=True)
-            else:
-                st.info("Nenhuma ferramenta essencial especificada.")
-            st.markdown("</div>", unsafe_allow_html=True)
-
-        # -----------------------------
-        # 3. PROJETOS PRÁTICOS
-        # -----------------------------
-        with st.container():
-            st.markdown("<div class='json-card' style='background-color:#fff8e1; border-left: 5px solid #ffc107;'>", unsafe_allow_html=True)
-            st.subheader("🏗️ Projetos Práticos Obrigatórios")
-
-            projetos = roadmap_data.get("projetos_praticos", [])
-            for i, projeto in enumerate(projetos):
-                st.markdown(f"**{i+1}. {projeto.get('titulo', 'Projeto Sem Nome')}**")
-                st.markdown(f"*Objetivo:* {projeto.get('objetivo', 'N/A')}")
-                st.markdown(f"*Desenvolve Habilidades:* {projeto.get('desenvolve_habilidades', 'N/A')}")
-                if i < len(projetos) - 1:
-                    st.markdown("---")
-            st.markdown("</div>", unsafe_allow_html=True)
-
-        # -----------------------------
-        # 4. PLANO DE EVOLUÇÃO (30/60/90 dias)
-        # -----------------------------
-        with st.container():
-            st.markdown("<div class='json-card'>", unsafe_allow_html=True)
-            st.subheader("🗓️ Plano de Evolução")
-
-            dias_planos = [
-                ("📅 30 Dias", roadmap_data.get("plano_30_dias"), "#e8f5e8", "#28a745"),
-                ("📅 60 Dias", roadmap_data.get("plano_60_dias"), "#fff3cd", "#ffc107"), 
-                ("📅 90 Dias", roadmap_data.get("plano_90_dias"), "#d1ecf1", "#17a2b8")
-            ]
-
-            cols = st.columns(3)
-
-            for i, (dias, plano, cor_fundo, cor_borda) in enumerate(dias_planos):
-                if plano and cols[i]:
-                    with cols[i]:
-                        # Card individual para cada período
-                        st.markdown(f"""
-                        <div style='
-                            background-color: {cor_fundo}; 
-                            border-left: 5px solid {cor_borda};
-                            border-radius: 10px;
-                            padding: 15px;
-                            margin: 5px;
-                            height: 100%;
-                        '>
-                        """, unsafe_allow_html=True)
-                        
-                        st.markdown(f"**{dias}**")
-                        
-                        if plano.get('objetivos'):
-                            st.markdown("**🎯 Objetivos Chave:**")
-                            for o in plano.get('objetivos', []):
-                                st.markdown(f"• {o}")
-                        
-                        if plano.get('atividades'):
-                            st.markdown("**📚 Atividades:**")
-                            for a in plano.get('atividades', []):
-                                st.markdown(f"• {a}")
-                        
-                        st.markdown("</div>", unsafe_allow_html=True)
-            
-            st.markdown("</div>", unsafe_allow_html=True)
-
-        # -----------------------------
-        # 5. RESULTADO ESPERADO
-        # -----------------------------
-        with st.container():
-            st.markdown("<div class='json-card' style='background-color:#f8f9fa; border-left: 5px solid #6c757d;'>", unsafe_allow_html=True)
-            st.subheader("🏆 Resultado Final Esperado (90 Dias)")
-            resultado = roadmap_data.get('resultado_90_dias_esperado', 'Resultado final não especificado.')
-            st.info(resultado)
-            st.markdown("</div>", unsafe_allow_html=True)
-
-    except Exception as e:
-        st.error(f"⚠️ Erro ao processar. Verifique o nome de usuário ou a API Key: {str(e)}")
\ No newline at end of file
+    # Um pedido que a sessão já tem pronto é desenhado de novo sem refazer nada
+    st.session_state["current"] = JobQueue.job_key(username, objetivo)
+    st.session_state["show_timings"] = show_timings
+    if st.session_state["current"] in st.session_state.get("results", {}):
+        st.session_state.pop("job_id", None)
+    else:
+        # Pedidos iguais em andamento (outra aba, outro usuário, clique duplo) reaproveitam o mesmo job
+        try:
+            st.session_state["job_id"] = get_job_queue().submit(username, objetivo)
+        except JobQueueFull as e:
+            st.warning(f"⏳ {e}")
+            st.stop()
+
+# Reruns (qualquer interação na página) usam o resultado guardado na sessão.
+# Se ainda não houver, o job continua no servidor e a página volta a acompanhá-lo de onde estiver.
+show_timings = st.session_state.get("show_timings", False)
+results = st.session_state.get("results", {}).get(st.session_state.get("current"))
+job = get_job_queue().get(st.session_state["job_id"]) if "job_id" in st.session_state else None
+if job is not None:
+    render_job(job, show_timings)
+elif results is not None:
+    render_results(results, show_timings)
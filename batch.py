@@ -0,0 +1,219 @@
+"""
+Modo em lote: roda coleta -> análise -> Mentor IA para uma lista de usuários.
+
+Uso:
+    python batch.py usuarios.txt --output resultados.jsonl --goal "Backend Python"
+    cat usuarios.txt | python batch.py - --output resultados.jsonl --skip-ai
+
+Cada resultado é gravado no JSONL assim que termina. O próprio arquivo de saída
+serve de checkpoint: ao rodar de novo, usuários já concluídos com sucesso são pulados.
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+from analyzer import SkillAnalyzer
+from cache import DiskCache, HTTPCache
+from github_collector import GitHubCollector
+from github_graphql_collector import GitHubGraphQLCollector
+from mentor_ai import MentorAI, load_environment
+from percentiles import PercentileIndex
+from rate_limiter import get_scheduler
+
+
+class StageStats:
+    """Contadores de uma etapa (sucessos, falhas e tempo gasto)."""
+
+    def __init__(self, name):
+        self.name = name
+        self.ok = 0
+        self.failed = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, ok, seconds):
+        with self._lock:
+            if ok:
+                self.ok += 1
+            else:
+                self.failed += 1
+            self.seconds += seconds
+
+    def summary(self, elapsed):
+        done = self.ok + self.failed
+        throughput = self.ok / elapsed if elapsed > 0 else 0.0
+        avg = self.seconds / done if done else 0.0
+        return (f"{self.name:<8} ok={self.ok} falhas={self.failed} "
+                f"vazão={throughput:.2f}/s média={avg:.2f}s")
+
+
+class BatchRunner:
+    def __init__(self, output, goal=None, collect_workers=8, llm_workers=2, skip_ai=False):
+        self.output = output
+        self.goal = goal
+        self.collect_workers = collect_workers
+        self.llm_workers = llm_workers
+        self.skip_ai = skip_ai
+
+        self.analyzer = SkillAnalyzer(percentile_index=PercentileIndex(".cache/percentiles.jsonl"))
+        self.http_cache = HTTPCache(".cache/github")
+        self.snapshots = DiskCache(".cache/snapshots", max_entries=5000, ttl=30 * 24 * 3600)
+        self.mentor = None if skip_ai else MentorAI(cache=DiskCache(".cache/mentor", max_entries=500, ttl=7 * 24 * 3600))
+
+        self.stats = {"collect": StageStats("collect"), "ai": StageStats("ai")}
+        self._write_lock = threading.Lock()
+
+    # -----------------------------
+    # CHECKPOINT E SAÍDA
+    # -----------------------------
+
+    def completed_users(self):
+        """Usuários que já têm resultado de sucesso no arquivo de saída."""
+        done = set()
+        if not os.path.exists(self.output):
+            return done
+        with open(self.output, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue  # linha cortada por uma execução interrompida
+                if row.get("status") == "ok":
+                    done.add(row["username"])
+                else:
+                    done.discard(row.get("username"))
+        return done
+
+    def write(self, row):
+        with self._write_lock:
+            with open(self.output, "a", encoding="utf-8") as f:
+                f.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+                f.flush()
+
+    # -----------------------------
+    # ETAPAS
+    # -----------------------------
+
+    def build_collector(self, username):
+        if os.getenv("GITHUB_BACKEND", "rest").lower() == "graphql":
+            return GitHubGraphQLCollector(username)
+        return GitHubCollector(username, cache=self.http_cache, snapshots=self.snapshots)
+
+    def collect(self, username):
+        start = time.monotonic()
+        try:
+            raw_data = self.build_collector(username).collect_profile_data()
+            analyzed = self.analyzer.analyze(raw_data, key=username)
+        except Exception as e:
+            self.stats["collect"].record(False, time.monotonic() - start)
+            self.write({"username": username, "status": "error", "stage": "collect", "error": str(e)})
+            return None
+        self.stats["collect"].record(True, time.monotonic() - start)
+        return {"username": username, "analysis": analyzed, "pending_repos": raw_data.get("pending_repos", [])}
+
+    def advise(self, row):
+        start = time.monotonic()
+        try:
+            row["feedback"] = self.mentor.analyze_profile(row["analysis"])
+            if self.goal:
+                # O cache do MentorAI faz o roadmap do mesmo objetivo ser gerado uma vez só
+                row["roadmap"] = self.mentor.generate_roadmap(self.goal)
+        except Exception as e:
+            self.stats["ai"].record(False, time.monotonic() - start)
+            self.write({"username": row["username"], "status": "error", "stage": "ai", "error": str(e)})
+            return
+        self.stats["ai"].record(True, time.monotonic() - start)
+        self.write(dict(row, status="ok"))
+
+    # -----------------------------
+    # EXECUÇÃO
+    # -----------------------------
+
+    def run(self, usernames):
+        done = self.completed_users()
+        todo = list(dict.fromkeys(u for u in usernames if u not in done))
+        print(f"{len(todo)} usuários para processar ({len(done)} já concluídos)", file=sys.stderr)
+
+        started = time.monotonic()
+        # Limita quantos perfis coletados podem esperar pela etapa de IA (até 4 por worker), sem
+        # tirar vagas das coletas em andamento. Sem IA não há fila a limitar.
+        backlog = None if self.skip_ai else threading.Semaphore(self.collect_workers + self.llm_workers * 4)
+
+        with ThreadPoolExecutor(max_workers=self.llm_workers) as llm_pool:
+            def after_collect(future):
+                row = future.result()
+                if backlog is None:
+                    if row is not None:
+                        self.write(dict(row, status="ok"))
+                elif row is None:
+                    backlog.release()
+                else:
+                    llm_pool.submit(self._advise_and_release, row, backlog)
+
+            with ThreadPoolExecutor(max_workers=self.collect_workers) as collect_pool:
+                for username in todo:
+                    if backlog is not None:
+                        backlog.acquire()
+                    collect_pool.submit(self.collect, username).add_done_callback(after_collect)
+
+        elapsed = time.monotonic() - started
+        print(f"Concluído em {elapsed:.1f}s", file=sys.stderr)
+        for stats in self.stats.values():
+            print(stats.summary(elapsed), file=sys.stderr)
+        if os.getenv("METRICS_FILE"):
+            metrics.write_prometheus(os.getenv("METRICS_FILE"))
+
+    def _advise_and_release(self, row, backlog):
+        try:
+            self.advise(row)
+        finally:
+            backlog.release()
+
+
+def read_usernames(source):
+    stream = sys.stdin if source == "-" else open(source, encoding="utf-8")
+    try:
+        for line in stream:
+            username = line.strip()
+            if username and not username.startswith("#"):
+                yield username
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Análise em lote de perfis do GitHub.")
+    parser.add_argument("usernames", nargs="?", default="-", help="arquivo com um usuário por linha ('-' = stdin)")
+    parser.add_argument("--output", required=True, help="arquivo JSONL de resultados (também é o checkpoint)")
+    parser.add_argument("--goal", help="objetivo de carreira para gerar o roadmap")
+    parser.add_argument("--collect-workers", type=int, default=8, help="coletas simultâneas no GitHub")
+    parser.add_argument("--llm-workers", type=int, default=2, help="chamadas simultâneas ao Gemini")
+    parser.add_argument("--skip-ai", action="store_true", help="só coleta e análise, sem chamar o Gemini")
+    parser.add_argument("--max-rate-wait", type=float, default=3600,
+                        help="espera máxima (s) pelo rate limit do GitHub antes de falhar o usuário")
+    args = parser.parse_args(argv)
+
+    load_environment()
+    # No lote vale mais esperar a cota renovar do que falhar
+    for resource in ("core", "graphql"):
+        get_scheduler(resource).max_wait = args.max_rate_wait
+
+    runner = BatchRunner(
+        args.output,
+        goal=args.goal,
+        collect_workers=args.collect_workers,
+        llm_workers=args.llm_workers,
+        skip_ai=args.skip_ai,
+    )
+    runner.run(read_usernames(args.usernames))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Benchmarks com substitutos locais do GitHub e do Gemini (veja benchmarks/run.py)."""
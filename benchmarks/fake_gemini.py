@@ -0,0 +1,175 @@
+"""
+Modelo falso com a mesma interface usada do google.generativeai.GenerativeModel.
+Devolve JSON válido depois de um atraso configurável, com ou sem streaming,
+e pode injetar os defeitos comuns das respostas reais (defect_rate), latências
+com cauda longa (heavy_tail) e falhas transitórias (failure_rate).
+"""
+
+import json
+import random
+import re
+import threading
+import time
+
+ANALYSIS = {
+    "resumo_geral": "Perfil sintético usado em benchmarks.",
+    "forcas_tecnicas": ["Python", "Boa cadência de commits", "Projetos bem organizados"],
+    "pontos_melhorar": ["Testes automatizados", "Documentação"],
+    "sugestoes_curto_prazo": ["Adicionar CI", "Escrever um README completo"],
+    "caminhos_carreira": [
+        {"titulo": f"Caminho {i}", "compatibilidade": "Alta",
+         "desenvolvimento_necessario": "Aprofundar fundamentos.", "oportunidades": "Empresas de produto."}
+        for i in range(3)
+    ],
+}
+
+ROADMAP = {
+    "meta_carreira": "Backend Python",
+    "fundamentos_essenciais": ["HTTP", "Bancos de dados", "Testes"],
+    "projetos_praticos": [
+        {"titulo": f"Projeto {i}", "objetivo": "Construir uma API.", "desenvolve_habilidades": "APIs e SQL."}
+        for i in range(4)
+    ],
+    "ferramentas_essenciais": [
+        {"nome": "FastAPI", "prioridade": "Alta", "quando_aprender": "Dia 30", "conexao_mercado": "Muito usado."},
+        {"nome": "PostgreSQL", "prioridade": "Alta", "quando_aprender": "Dia 30", "conexao_mercado": "Padrão de mercado."},
+    ],
+    "plano_30_dias": {"objetivos": ["Base"], "atividades": ["Estudar"]},
+    "plano_60_dias": {"objetivos": ["Projetos"], "atividades": ["Construir"]},
+    "plano_90_dias": {"objetivos": ["Portfólio"], "atividades": ["Publicar"]},
+    "resultado_90_dias_esperado": "Pronto para vagas júnior.",
+}
+
+
+class FakeChunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeResponse:
+    def __init__(self, text, prompt):
+        self.text = text
+        self.usage_metadata = FakeUsage(prompt, text)
+
+
+class FakeUsage:
+    def __init__(self, prompt, text):
+        # Aproximação grosseira de 4 caracteres por token
+        self.prompt_token_count = len(prompt) // 4
+        self.candidates_token_count = len(text) // 4
+        self.total_token_count = self.prompt_token_count + self.candidates_token_count
+
+
+class ServiceUnavailable(Exception):
+    """Mesmo nome da exceção do google.api_core para um 503 do Gemini."""
+
+
+def heavy_tail(median, sigma=0.5, stall_rate=0.0, stall=5.0):
+    """
+    Distribuição de latência para o parâmetro delay: log-normal em torno de `median`,
+    com `stall_rate` das chamadas travando por `stall` segundos.
+    """
+    def draw(rng):
+        if rng.random() < stall_rate:
+            return stall
+        return median * rng.lognormvariate(0, sigma)
+    return draw
+
+
+class FakeModel:
+    """
+    delay: segundos até a resposta completa (no streaming, dividido entre os pedaços),
+        ou uma função delay(rng) que sorteia o atraso de cada chamada (ex: heavy_tail).
+        Com response_schema pedindo só alguns campos, o atraso é proporcional ao tamanho.
+    chunk_size: tamanho máximo de cada pedaço no streaming; os cortes caem em posições aleatórias.
+    defect_rate: fração das respostas com um dos `defects` (ver corrupt).
+    failure_rate: fração das chamadas que falham com ServiceUnavailable depois de `failure_delay`.
+    """
+
+    DEFECTS = ("fence", "trailing_comma", "truncated", "missing_field")
+
+    def __init__(self, delay=0.5, chunk_size=40, seed=0, analysis=None, roadmap=None,
+                 defect_rate=0.0, defects=DEFECTS, failure_rate=0.0, failure_delay=0.01, model_name=None):
+        self.delay = delay
+        self.chunk_size = chunk_size
+        self.analysis = analysis or ANALYSIS
+        self.roadmap = roadmap or ROADMAP
+        self.defect_rate = defect_rate
+        self.defects = defects
+        self.failure_rate = failure_rate
+        self.failure_delay = failure_delay
+        if model_name:
+            self.model_name = model_name
+        self.calls = 0
+        self.failures = 0
+        self.injected = {}
+        self._rng = random.Random(seed)
+        # Latências e falhas têm sorteio próprio para não mudar os defeitos de uma mesma semente
+        self._latency_rng = random.Random(seed + 1)
+        self._lock = threading.Lock()
+
+    def document_for(self, prompt):
+        return self.roadmap if "roadmap" in prompt.lower() else self.analysis
+
+    def generate_content(self, prompt, stream=False, generation_config=None, **kwargs):
+        with self._lock:
+            self.calls += 1
+            fail = self._latency_rng.random() < self.failure_rate
+            base = self.delay(self._latency_rng) if callable(self.delay) else self.delay
+            if fail:
+                self.failures += 1
+        if fail:
+            time.sleep(self.failure_delay)
+            raise ServiceUnavailable("503 O modelo está sobrecarregado.")
+        document = self.document_for(prompt)
+        full_size = len(json.dumps(document, ensure_ascii=False, indent=2))
+        schema = (generation_config or {}).get("response_schema")
+        if schema:
+            document = {k: v for k, v in document.items() if k in schema["properties"]}
+        text = self.corrupt(document)
+        delay = base * min(1.0, len(text) / full_size)
+        if not stream:
+            time.sleep(delay)
+            return FakeResponse(text, prompt)
+        return self._stream(text, delay)
+
+    def corrupt(self, document):
+        """JSON do documento, com um defeito sorteado em `defect_rate` das vezes."""
+        with self._lock:
+            defect = self._rng.choice(self.defects) if self._rng.random() < self.defect_rate else None
+            cut = self._rng.uniform(0.5, 0.95)
+            dropped = self._rng.choice(list(document)) if document else None
+            if defect:
+                self.injected[defect] = self.injected.get(defect, 0) + 1
+
+        if defect == "missing_field":
+            document = {k: v for k, v in document.items() if k != dropped}
+        text = json.dumps(document, ensure_ascii=False, indent=2)
+        if defect == "fence":
+            return f"```json\n{text}\n```"
+        if defect == "trailing_comma":
+            return re.sub(r"(\S)(\n\s*[}\]])", r"\1,\2", text, count=2)
+        if defect == "truncated":
+            return text[:int(len(text) * cut)]
+        return text
+
+    def split(self, text):
+        """Corta o texto em pedaços de tamanho aleatório."""
+        with self._lock:
+            sizes = []
+            total = 0
+            while total < len(text):
+                size = self._rng.randint(1, self.chunk_size)
+                sizes.append(size)
+                total += size
+        pieces, pos = [], 0
+        for size in sizes:
+            pieces.append(text[pos:pos + size])
+            pos += size
+        return pieces
+
+    def _stream(self, text, delay):
+        pieces = self.split(text)
+        for piece in pieces:
+            time.sleep(delay / len(pieces))
+            yield FakeChunk(piece)
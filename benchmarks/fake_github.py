@@ -0,0 +1,355 @@
+"""
+Servidor local que imita as partes da API do GitHub usadas pelos coletores.
+
+Gera usuários sintéticos e determinísticos: o número de repos vem do sufixo do
+nome ("bench-120" tem 120 repos) ou de repos_per_user. Dá para configurar
+latência por requisição, repos que respondem 202 ("calculando estatísticas")
+e uma cota que passa a devolver 403 com os headers de rate limit. Com um
+certificado (ver self_signed_cert) o servidor atende em HTTPS.
+"""
+
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import shutil
+import ssl
+import subprocess
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from activity import WEEK, week_start
+
+LANGUAGES = ["Python", "JavaScript", "TypeScript", "Go", "Java", "Rust", "C", None]
+
+
+def self_signed_cert(directory):
+    """Gera certificado e chave para 127.0.0.1 com o openssl; retorna None se ele não existir."""
+    if shutil.which("openssl") is None:
+        return None
+    cert, key = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-keyout", key, "-out", cert, "-subj", "/CN=127.0.0.1",
+         "-addext", "subjectAltName=IP:127.0.0.1"],
+        check=True, capture_output=True,
+    )
+    return cert, key
+
+
+class FakeGitHub:
+    def __init__(self, repos_per_user=30, latency=0.0, computing_ratio=0.0, computing_polls=1,
+                 rate_limit=None, rate_window=60, weeks=52, tls=None):
+        self.repos_per_user = repos_per_user
+        self.latency = latency                  # segundos de espera em cada resposta
+        self.computing_ratio = computing_ratio  # fração dos repos que começam respondendo 202
+        self.computing_polls = computing_polls  # quantas consultas respondem 202 antes do 200
+        self.rate_limit = rate_limit            # requisições por janela (None = sem limite)
+        self.rate_window = rate_window
+        self.weeks = weeks
+        self.tls = tls                          # (certificado, chave) para atender em HTTPS
+
+        self._lock = threading.Lock()
+        self._polls = {}
+        self._window_start = time.time()
+        self._window_used = 0
+        self.requests = 0
+        self.requests_by_kind = {}
+        self.connections = 0
+        self.pushes = {}  # (usuário, índice do repo) -> quantidade de pushes simulados
+        self.errors = {}  # (usuário, nome do repo) -> status devolvido pela atividade e pela árvore
+
+        self._server = None
+        self._thread = None
+
+    # -----------------------------
+    # CICLO DE VIDA
+    # -----------------------------
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"{'https' if self.tls else 'http'}://{host}:{port}"
+
+    def start(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Sem isso, com keep-alive, o Nagle + ACK atrasado somam ~40ms por resposta
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def setup(self):
+                if fake.tls:
+                    # Cada conexão nova paga um handshake TLS completo
+                    self.request.do_handshake()
+                super().setup()
+                with fake._lock:
+                    fake.connections += 1
+
+            def do_GET(self):
+                fake._handle(self, "GET", None)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                fake._handle(self, "POST", self.rfile.read(length))
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        if self.tls:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(*self.tls)
+            self._server.socket = context.wrap_socket(
+                self._server.socket, server_side=True, do_handshake_on_connect=False)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset_counters(self):
+        with self._lock:
+            self.requests = 0
+            self.requests_by_kind = {}
+            self.connections = 0
+            self._polls = {}
+
+    def push(self, username, indices):
+        """Simula pushes: muda o pushed_at dos repos indicados."""
+        with self._lock:
+            for i in indices:
+                self.pushes[(username, i)] = self.pushes.get((username, i), 0) + 1
+
+    def fail(self, username, repos, status=502):
+        """Faz a atividade e a árvore dos repos indicados responderem `status` (None volta ao normal)."""
+        with self._lock:
+            for name in repos:
+                if status is None:
+                    self.errors.pop((username, name), None)
+                else:
+                    self.errors[(username, name)] = status
+
+    # -----------------------------
+    # DADOS SINTÉTICOS
+    # -----------------------------
+
+    def repo_count(self, username):
+        match = re.search(r"-(\d+)$", username)
+        return int(match.group(1)) if match else self.repos_per_user
+
+    def _rng(self, *parts):
+        seed = hashlib.sha256("|".join(map(str, parts)).encode()).hexdigest()
+        return random.Random(int(seed[:16], 16))
+
+    def repo_payload(self, username, i):
+        """Repo no formato da API REST, com os campos aninhados que ela costuma trazer."""
+        rng = self._rng(username, i)
+        name = f"repo-{i}" if rng.random() > 0.1 else f"repo-{i}-tests"
+        base = f"https://api.github.com/repos/{username}/{name}"
+        owner = {
+            "login": username, "id": 1000 + i, "type": "User", "site_admin": False,
+            "avatar_url": f"https://avatars.githubusercontent.com/u/{1000 + i}",
+            **{f"{k}_url": f"https://api.github.com/users/{username}/{k}" for k in (
+                "followers", "following", "gists", "starred", "subscriptions",
+                "organizations", "repos", "events", "received_events")},
+        }
+        payload = {
+            "id": 10_000 + i, "node_id": f"R_{i:08d}", "name": name,
+            "full_name": f"{username}/{name}", "private": False, "owner": owner,
+            "html_url": f"https://github.com/{username}/{name}", "description": "Repositório sintético " * 3,
+            "fork": False, "url": base,
+            "created_at": "2021-01-01T00:00:00Z", "updated_at": "2024-01-01T00:00:00Z",
+            "pushed_at": f"2024-{1 + i % 12:02d}-01T00:{self.pushes.get((username, i), 0):02d}:00Z",
+            "homepage": None, "size": rng.randint(0, 5000),
+            "stargazers_count": rng.randint(0, 50), "watchers_count": rng.randint(0, 50),
+            "language": rng.choice(LANGUAGES), "has_issues": True, "has_projects": True,
+            "has_downloads": rng.random() > 0.3, "has_wiki": True, "has_pages": False,
+            "forks_count": rng.randint(0, 5), "archived": False, "disabled": False,
+            "open_issues_count": rng.randint(0, 4),
+            "license": {"key": "mit", "name": "MIT License", "spdx_id": "MIT",
+                        "url": "https://api.github.com/licenses/mit", "node_id": "MDc6TGljZW5zZTEz"},
+            "topics": ["benchmark", "synthetic"], "visibility": "public",
+            "forks": 0, "open_issues": 0, "watchers": 0, "default_branch": "main",
+        }
+        for k in ("forks", "keys", "collaborators", "teams", "hooks", "issue_events", "events",
+                  "assignees", "branches", "tags", "blobs", "git_tags", "git_refs", "trees",
+                  "statuses", "languages", "stargazers", "contributors", "subscribers",
+                  "subscription", "commits", "git_commits", "comments", "issue_comment",
+                  "contents", "compare", "merges", "archive", "downloads", "issues", "pulls",
+                  "milestones", "notifications", "labels", "releases", "deployments"):
+            payload[f"{k}_url"] = f"{base}/{k}"
+        return payload
+
+    def commit_activity(self, username, repo):
+        rng = self._rng(username, repo, "activity")
+        # Como no GitHub, a última semana é a atual
+        start = week_start(time.time()) - (self.weeks - 1) * WEEK
+        return [
+            {"week": start + w * WEEK, "total": t, "days": [t // 7] * 7}
+            for w, t in ((w, rng.choice([0, 0, 1, 2, 5, 12])) for w in range(self.weeks))
+        ]
+
+    def tree(self, username, repo):
+        rng = self._rng(username, repo, "tree")
+        paths = ["src/main.py", "src/util.py", "setup.py"]
+        paths += [f"src/pkg/module_{k}.py" for k in range(rng.randint(20, 300))]
+        if rng.random() > 0.3:
+            paths.append("README.md")
+        if rng.random() > 0.5:
+            paths += ["tests/test_main.py", "tests/__init__.py"]
+        if rng.random() > 0.6:
+            paths.append(".github/workflows/ci.yml")
+        sha = hashlib.sha1("|".join(paths).encode()).hexdigest()
+        return {"sha": sha, "truncated": False,
+                "tree": [{"path": p, "type": "blob", "sha": hashlib.sha1(p.encode()).hexdigest()} for p in paths]}
+
+    # -----------------------------
+    # ROTEAMENTO
+    # -----------------------------
+
+    def _handle(self, handler, method, body):
+        if self.latency:
+            time.sleep(self.latency)
+
+        parsed = urlparse(handler.path)
+        query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        path = parsed.path
+
+        with self._lock:
+            self.requests += 1
+            now = time.time()
+            if now - self._window_start >= self.rate_window:
+                self._window_start, self._window_used = now, 0
+            self._window_used += 1
+            reset = math.ceil(self._window_start + self.rate_window)
+            remaining = None if self.rate_limit is None else max(self.rate_limit - self._window_used, 0)
+            limited = self.rate_limit is not None and self._window_used > self.rate_limit
+
+        headers = {}
+        if remaining is not None:
+            headers = {"X-RateLimit-Limit": str(self.rate_limit),
+                       "X-RateLimit-Remaining": str(remaining), "X-RateLimit-Reset": str(reset)}
+        if limited:
+            self._count("rate_limited")
+            return self._send(handler, 403, {"message": "API rate limit exceeded"}, headers)
+
+        if method == "POST" and path == "/graphql":
+            self._count("graphql")
+            return self._send(handler, 200, self._graphql(json.loads(body)), headers)
+
+        match = re.fullmatch(r"/users/([^/]+)/repos", path)
+        if match:
+            self._count("repos")
+            return self._repos(handler, match.group(1), query, headers)
+
+        match = re.fullmatch(r"/repos/([^/]+)/([^/]+)/stats/commit_activity", path)
+        if match:
+            self._count("commit_activity")
+            username, repo = match.groups()
+            if (username, repo) in self.errors:
+                return self._send(handler, self.errors[(username, repo)], {"message": "Server Error"}, headers)
+            rng = self._rng(username, repo, "computing")
+            if rng.random() < self.computing_ratio:
+                with self._lock:
+                    polls = self._polls[(username, repo)] = self._polls.get((username, repo), 0) + 1
+                if polls <= self.computing_polls:
+                    return self._send(handler, 202, {}, headers)
+            return self._send(handler, 200, self.commit_activity(username, repo), headers)
+
+        match = re.fullmatch(r"/repos/([^/]+)/([^/]+)/git/trees/([^/]+)", path)
+        if match:
+            self._count("tree")
+            username, repo, _ = match.groups()
+            if (username, repo) in self.errors:
+                return self._send(handler, self.errors[(username, repo)], {"message": "Server Error"}, headers)
+            return self._send(handler, 200, self.tree(username, repo), headers)
+
+        self._count("not_found")
+        return self._send(handler, 404, {"message": "Not Found"}, headers)
+
+    def _repos(self, handler, username, query, headers):
+        per_page = min(int(query.get("per_page", 30)), 100)
+        page = int(query.get("page", 1))
+        total = self.repo_count(username)
+        first = (page - 1) * per_page
+        items = [self.repo_payload(username, i) for i in range(first, min(first + per_page, total))]
+        if first + per_page < total:
+            headers = dict(headers, Link=f'<{self.url}/users/{username}/repos?per_page={per_page}&page={page + 1}>; rel="next"')
+        return self._send(handler, 200, items, headers)
+
+    def _graphql(self, request):
+        variables = request.get("variables", {})
+        username = variables["login"]
+        total = self.repo_count(username)
+        first = int(variables.get("cursor") or 0)
+        last = min(first + 100, total)
+
+        nodes = []
+        for i in range(first, last):
+            repo = self.repo_payload(username, i)
+            paths = [entry["path"] for entry in self.tree(username, repo["name"])["tree"]]
+            workflows = [p.rsplit("/", 1)[1] for p in paths if p.startswith(".github/workflows/")]
+            nodes.append({
+                "name": repo["name"],
+                "diskUsage": repo["size"],
+                "primaryLanguage": {"name": repo["language"]} if repo["language"] else None,
+                "issues": {"totalCount": repo["open_issues_count"]},
+                "pullRequests": {"totalCount": 0},
+                "root": {"oid": "0" * 40, "entries": [{"name": n} for n in sorted({p.split("/")[0] for p in paths})]},
+                "workflows": {"entries": [{"name": n} for n in workflows]} if workflows else None,
+            })
+        user = {"repositories": {"pageInfo": {"hasNextPage": last < total, "endCursor": str(last)}, "nodes": nodes}}
+
+        if variables.get("withCalendar"):
+            rng = self._rng(username, "calendar")
+            # Mesmas semanas do commit_activity: a última é a atual
+            start = week_start(time.time()) - (self.weeks - 1) * WEEK
+            user["contributionsCollection"] = {"contributionCalendar": {"weeks": [
+                {
+                    "firstDay": time.strftime("%Y-%m-%d", time.gmtime(start + w * WEEK)),
+                    "contributionDays": [{"contributionCount": rng.choice([0, 0, 1, 3])} for _ in range(7)],
+                }
+                for w in range(self.weeks)
+            ]}}
+        return {"data": {"user": user}}
+
+    # -----------------------------
+    # SUPORTE
+    # -----------------------------
+
+    def _count(self, kind):
+        with self._lock:
+            self.requests_by_kind[kind] = self.requests_by_kind.get(kind, 0) + 1
+
+    def _send(self, handler, status, body, headers):
+        data = json.dumps(body).encode()
+        etag = '"%s"' % hashlib.sha1(data).hexdigest()
+        if status == 200 and handler.headers.get("If-None-Match") == etag:
+            status, data = 304, b""
+
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(data)))
+        if status in (200, 304):
+            handler.send_header("ETag", etag)
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(data)
@@ -0,0 +1,836 @@
+"""
+Cenários de benchmark do pipeline, rodando contra os substitutos locais do
+GitHub (FakeGitHub) e do Gemini (FakeModel), sem rede e sem cota.
+
+Uso:
+    python -m benchmarks.run                          # todos os cenários
+    python -m benchmarks.run collect flow -n 10       # só alguns
+    python -m benchmarks.run --output bench.json      # salva o JSON para comparar depois
+
+A saída é um JSON com latências (p50/p90/p99), contagem de requisições e pico
+de memória de cada cenário.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from activity import WEEK, WeeklyActivity, week_start  # noqa: E402
+from analyzer import SkillAnalyzer  # noqa: E402
+from cache import DiskCache  # noqa: E402
+from github_collector import GitHubCollector, RepoRecord, compact_repos  # noqa: E402
+from repo_files import detect  # noqa: E402
+from http_transport import Transport  # noqa: E402
+from jobs import JobQueue, JobQueueFull  # noqa: E402
+from json_stream import IncrementalJSONParser, iter_events  # noqa: E402
+from mentor_ai import MentorAI  # noqa: E402
+from pipeline import Pipeline  # noqa: E402
+from rate_limiter import RateLimitScheduler  # noqa: E402
+
+from benchmarks.fake_gemini import FakeModel  # noqa: E402
+from benchmarks.fake_github import FakeGitHub, self_signed_cert  # noqa: E402
+
+SCENARIOS = {}
+
+
+def scenario(fn):
+    SCENARIOS[fn.__name__] = fn
+    return fn
+
+
+# -----------------------------
+# MEDIÇÃO
+# -----------------------------
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(p / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(times, **extra):
+    times = sorted(times)
+    return {
+        "iterations": len(times),
+        "mean_s": round(sum(times) / len(times), 6),
+        "p50_s": round(percentile(times, 50), 6),
+        "p90_s": round(percentile(times, 90), 6),
+        "p99_s": round(percentile(times, 99), 6),
+        **extra,
+    }
+
+
+def measure(fn, iterations):
+    """Roda fn várias vezes para medir tempo e uma vez a mais sob tracemalloc para o pico de memória."""
+    times = []
+    result = None
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return times, peak // 1024, result
+
+
+def unlimited_scheduler():
+    # O ritmo do agendador real distorceria as medições contra o servidor local
+    return RateLimitScheduler(rate=1e9, burst=1e9)
+
+
+def make_collector(github, username, **kwargs):
+    kwargs.setdefault("scheduler", unlimited_scheduler())
+    return GitHubCollector(username, api_url=github.url, **kwargs)
+
+
+# -----------------------------
+# CENÁRIOS
+# -----------------------------
+
+@scenario
+def collect(args):
+    """collect_profile_data: serial x concorrente, conforme cresce o número de repos."""
+    results = {}
+    with FakeGitHub(latency=args.latency) as github:
+        for repos in (10, 50, 100, 200):
+            for workers in (1, 8):
+                username = f"bench-{repos}"
+                collectors = []
+
+                def run():
+                    collector = make_collector(github, username, max_workers=workers)
+                    collectors.append(collector)
+                    return collector.collect_profile_data()
+
+                github.reset_counters()
+                times, peak_kb, _ = measure(run, args.iterations)
+                results[f"collect[repos={repos},workers={workers}]"] = summarize(
+                    times,
+                    requests_per_profile=collectors[0].request_count,
+                    peak_kb=peak_kb,
+                )
+    return results
+
+
+@scenario
+def collect_202(args):
+    """Repos com estatísticas em cálculo (202) re-consultados em lote com backoff."""
+    results = {}
+    with FakeGitHub(latency=args.latency, computing_ratio=0.2, computing_polls=2) as github:
+        pending = []
+
+        def run():
+            github.reset_counters()
+            collector = make_collector(github, "bench-100", stats_backoff=0.05, stats_deadline=5)
+            data = collector.collect_profile_data()
+            pending.append(len(data["pending_repos"]))
+            return collector
+
+        times, peak_kb, collector = measure(run, args.iterations)
+        results["collect_202[repos=100,computing=20%]"] = summarize(
+            times, requests_per_profile=collector.request_count, pending_repos=max(pending), peak_kb=peak_kb,
+        )
+    return results
+
+
+@scenario
+def refresh(args):
+    """Nova coleta de um perfil já visto: só os repos com push novo voltam à API."""
+    results = {}
+    with FakeGitHub(latency=args.latency) as github, tempfile.TemporaryDirectory() as directory:
+        snapshots = DiskCache(directory)
+        username = "bench-200"
+        first = make_collector(github, username, snapshots=snapshots)
+        expected = first.collect_profile_data()
+        results["refresh[repos=200,first]"] = {"requests": first.request_count}
+
+        for changed in (0, 5, 20):
+            github.push(username, range(changed))
+            collectors = []
+
+            def run():
+                collector = make_collector(github, username, snapshots=snapshots)
+                collectors.append(collector)
+                return collector.collect_profile_data()
+
+            times, peak_kb, data = measure(run, args.iterations)
+            results[f"refresh[repos=200,changed={changed}]"] = summarize(
+                times,
+                requests_per_profile=collectors[0].request_count,
+                same_activity=data["activity"] == expected["activity"],
+                peak_kb=peak_kb,
+            )
+    return results
+
+
+def retained_kb(build):
+    """Memória (KB) que continua alocada depois de build() retornar, enquanto o resultado está vivo."""
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current / 1024
+
+
+@scenario
+def repo_memory(args):
+    """Memória retida por 1.000 repos: JSON completo da API x RepoRecord."""
+    github = FakeGitHub()
+    pages = [
+        json.dumps([github.repo_payload("bench", i) for i in range(first, first + 100)])
+        for first in range(0, 1000, 100)
+    ]
+
+    raw_kb = retained_kb(lambda: [repo for page in pages for repo in json.loads(page)])
+    records_kb = retained_kb(lambda: [RepoRecord.from_api(repo) for page in pages for repo in json.loads(page)])
+    cached_bytes = sum(len(page) for page in pages)
+    compact_bytes = sum(len(json.dumps(compact_repos(json.loads(page)))) for page in pages)
+    return {"repo_memory[1000 repos]": {
+        "raw_json_kb": round(raw_kb),
+        "repo_record_kb": round(records_kb),
+        "saved_kb": round(raw_kb - records_kb),
+        "reduction": round(raw_kb / records_kb, 1),
+        "http_cache_page_bytes_raw": cached_bytes,
+        "http_cache_page_bytes_compact": compact_bytes,
+    }}
+
+
+class BareTransport:
+    """Como o coletor fazia antes: um requests.get avulso (conexão nova) por chamada."""
+
+    def __init__(self, verify):
+        self.verify = verify
+
+    def get(self, url, params=None, headers=None):
+        import requests # type:ignore
+        return requests.get(url, params=params, headers=headers, verify=self.verify)
+
+
+class TimedTransport:
+    """Registra a latência de cada requisição feita pelo transporte envolvido."""
+
+    def __init__(self, transport):
+        self.transport = transport
+        self.times = []
+
+    def get(self, url, params=None, headers=None):
+        start = time.perf_counter()
+        r = self.transport.get(url, params=params, headers=headers)
+        self.times.append(time.perf_counter() - start)
+        return r
+
+
+@scenario
+def transport(args):
+    """Coleta contra um GitHub falso em HTTPS: requests.get avulso x pool com keep-alive."""
+    with tempfile.TemporaryDirectory() as directory:
+        tls = self_signed_cert(directory)
+        if tls is None:
+            return {"transport": {"skipped": "openssl não encontrado"}}
+        cert = tls[0]
+
+        candidates = {"bare_requests": lambda: BareTransport(cert), "session_pool": lambda: Transport(verify=cert)}
+        try:
+            import h2  # noqa: F401
+            import httpx  # noqa: F401
+            candidates["httpx_http2"] = lambda: Transport(verify=cert, http2=True)
+        except ImportError:
+            pass
+
+        results = {}
+        with FakeGitHub(latency=args.latency, tls=tls) as github:
+            for name, build in candidates.items():
+                github.reset_counters()
+                timed = TimedTransport(build())
+                start = time.perf_counter()
+                for _ in range(args.iterations):
+                    make_collector(github, "bench-100", transport=timed).collect_profile_data()
+                elapsed = time.perf_counter() - start
+                results[f"transport[{name},repos=100]"] = summarize(
+                    timed.times,
+                    profiles_per_s=round(args.iterations / elapsed, 2),
+                    requests=github.requests,
+                    tls_handshakes=github.connections,
+                )
+        return results
+
+
+@scenario
+def repo_files(args):
+    """README/testes/CI pela árvore git: chamadas, latência e acerto contra a heurística antiga."""
+    results = {}
+    username = "bench-100"
+    with FakeGitHub(latency=args.latency) as github, tempfile.TemporaryDirectory() as directory:
+        payloads = [github.repo_payload(username, i) for i in range(github.repo_count(username))]
+        truth = {p["name"]: detect(e["path"] for e in github.tree(username, p["name"])["tree"]) for p in payloads}
+        # Heurística anterior: has_downloads como README e "test" no nome como testes
+        old = {p["name"]: {"has_readme": p["has_downloads"], "has_tests": "test" in p["name"]} for p in payloads}
+
+        def accuracy(detected):
+            fields = ("has_readme", "has_tests")
+            hits = sum(detected[name][f] == truth[name][f] for name in truth for f in fields)
+            return round(hits / (len(truth) * len(fields)), 3)
+
+        snapshots = DiskCache(directory)
+        for label, kwargs in (("no_snapshot", {}), ("snapshot_warm", {"snapshots": snapshots})):
+            if kwargs:
+                make_collector(github, username, **kwargs).collect_profile_data()  # grava o snapshot
+            collectors = []
+
+            def run():
+                collector = make_collector(github, username, **kwargs)
+                collectors.append(collector)
+                return collector.collect_profile_data()
+
+            times, peak_kb, data = measure(run, args.iterations)
+            detected = {repo["name"]: repo for repo in data["repos"]}
+            results[f"repo_files[repos=100,{label}]"] = summarize(
+                times, requests_per_profile=collectors[0].request_count, accuracy=accuracy(detected), peak_kb=peak_kb,
+            )
+
+        results["repo_files[repos=100,old_heuristic]"] = {
+            "requests_per_profile": len(payloads) + 1, "accuracy": accuracy(old),
+            # Consultar contents/ para README, tests/ e .github/workflows em cada repo
+            "requests_per_profile_contents_lookup": 1 + len(payloads) * 4,
+        }
+    return results
+
+
+@scenario
+def rate_limit(args):
+    """Agendador compartilhado contra um servidor que devolve headers de rate limit."""
+    with FakeGitHub(rate_limit=40, rate_window=2) as github:
+        scheduler = RateLimitScheduler(rate=1e9, burst=1e9, max_wait=5)
+        collectors = [make_collector(github, "bench-25", scheduler=scheduler) for _ in range(3)]
+        start = time.perf_counter()
+        for collector in collectors:
+            collector.collect_profile_data()
+        elapsed = time.perf_counter() - start
+        per_profile = collectors[0].request_count
+        return {f"rate_limit[3x{per_profile} requests,quota=40/2s]": {
+            "total_s": round(elapsed, 3),
+            "rejected_403": github.requests_by_kind.get("rate_limited", 0),
+            "requests": github.requests,
+        }}
+
+
+def synthetic_profile(rng):
+    languages = {lang: rng.randint(1, 9) for lang in rng.sample(["Py", "JS", "Go", "C", "Rust", "TS"], rng.randint(0, 6))}
+    repos = [
+        {"name": f"r{i}", "size": rng.randint(0, 500), "open_issues_count": rng.randint(0, 3),
+         "has_readme": rng.random() < 0.5, "has_tests": rng.random() < 0.3}
+        for i in range(rng.randint(0, 40))
+    ]
+    activity = [rng.choice([0, 0, 1, 3, 12]) for _ in range(rng.choice([0, 12, 52]))]
+    return {"languages": languages, "repos": repos, "activity": activity}
+
+
+@scenario
+def analyze(args):
+    """SkillAnalyzer.analyze por perfil e analyze_many em lote."""
+    rng = random.Random(0)
+    analyzer = SkillAnalyzer()
+    profiles = [synthetic_profile(rng) for _ in range(args.profiles)]
+
+    results = {}
+    times, peak_kb, _ = measure(lambda: [analyzer.analyze(p) for p in profiles[:1000]], args.iterations)
+    results["analyze[1000 profiles,loop]"] = summarize(times, peak_kb=peak_kb)
+
+    try:
+        import numpy  # noqa: F401
+        import pandas  # noqa: F401
+    except ImportError:
+        results[f"analyze_many[{args.profiles} profiles]"] = {"skipped": "numpy/pandas não instalados"}
+        return results
+
+    times, peak_kb, _ = measure(lambda: [analyzer.analyze(p) for p in profiles], 1)
+    results[f"analyze[{args.profiles} profiles,loop]"] = summarize(times, peak_kb=peak_kb)
+    times, peak_kb, frame = measure(lambda: analyzer.analyze_many(profiles), 1)
+    results[f"analyze_many[{args.profiles} profiles]"] = summarize(times, peak_kb=peak_kb)
+
+    # Confere que o lote bate com o analyze linha a linha
+    mismatches = 0
+    for i, profile in enumerate(profiles[:2000]):
+        expected = analyzer.analyze(profile)
+        row = frame.iloc[i]
+        mismatches += sum(1 for key, value in expected.items() if row[key] != value)
+    results[f"analyze_many[{args.profiles} profiles]"]["mismatches_first_2000"] = mismatches
+    return results
+
+
+@scenario
+def activity(args):
+    """Soma alinhada da atividade de milhares de repos, métricas em lote e tamanho serializado."""
+    rng = random.Random(0)
+    current = week_start(time.time())
+    results = {}
+    for repos in (1000, 5000):
+        # Repos com históricos de tamanhos e datas finais diferentes
+        series = []
+        for _ in range(repos):
+            length = rng.choice([52, 52, 52, 30, 8])
+            end = current - rng.choice([0, 0, 0, 1, 10]) * WEEK
+            series.append(WeeklyActivity(end - (length - 1) * WEEK, [rng.choice([0, 0, 1, 3, 12]) for _ in range(length)]))
+        lists = [s.tolist() for s in series]
+
+        def zip_sum():
+            return [sum(week) for week in zip(*lists)]
+
+        def python_aligned():
+            first = min(s.start for s in series)
+            totals = [0] * ((current - first) // WEEK + 1)
+            for s, values in zip(series, lists):
+                offset = (s.start - first) // WEEK
+                for k, value in enumerate(values):
+                    totals[offset + k] += value
+            return totals
+
+        merged = WeeklyActivity.merge(series, end=current)
+        for name, fn in (("zip_truncating", zip_sum), ("python_aligned", python_aligned),
+                         ("numpy_merge", lambda: WeeklyActivity.merge(series, end=current))):
+            times, peak_kb, _ = measure(fn, args.iterations)
+            results[f"activity_merge[repos={repos},{name}]"] = summarize(times, peak_kb=peak_kb)
+        results[f"activity_merge[repos={repos},numpy_merge]"]["matches_python_aligned"] = merged.tolist() == python_aligned()
+        results[f"activity_merge[repos={repos},zip_truncating]"]["weeks"] = len(zip_sum())
+        results[f"activity_merge[repos={repos},numpy_merge]"]["weeks"] = len(merged)
+
+    analyzer = SkillAnalyzer()
+    histories = [[rng.choice([0, 0, 1, 3, 12]) for _ in range(rng.choice([0, 5, 12, 52, 104]))] for _ in range(args.profiles)]
+    times, peak_kb, batch = measure(lambda: analyzer.activity_metrics(histories), 1)
+    results[f"activity_metrics[{args.profiles} profiles,batch]"] = summarize(times, peak_kb=peak_kb)
+    times, _, single = measure(lambda: [analyzer.activity_metrics([h])[0] for h in histories[:1000]], 1)
+    results["activity_metrics[1000 profiles,one_by_one]"] = summarize(times)
+    results[f"activity_metrics[{args.profiles} profiles,batch]"]["mismatches_first_1000"] = sum(
+        a != b for a, b in zip(batch, single))
+
+    sample = WeeklyActivity(current - 51 * WEEK, histories[0][:52] or [0] * 52)
+    results["activity_serialization[52 weeks]"] = {
+        "json_list_bytes": len(json.dumps(sample.tolist())),
+        "binary_bytes": len(sample.to_bytes()),
+        "base64_bytes": len(sample.to_base64()),
+    }
+    return results
+
+
+@scenario
+def stream_parser(args):
+    """Parser incremental contra pedaços cortados em pontos aleatórios (texto e bytes)."""
+    model = FakeModel(delay=0, chunk_size=16, seed=1)
+    failures = 0
+    chunks = 0
+    start = time.perf_counter()
+    for i in range(200):
+        document = model.roadmap if i % 2 else model.analysis
+        text = json.dumps(document, ensure_ascii=False, indent=i % 3)
+        pieces = model.split(text)
+        if i % 4 == 0:
+            # Em bytes, os cortes podem cair no meio de um caractere UTF-8
+            data = text.encode("utf-8")
+            pieces, pos = [], 0
+            while pos < len(data):
+                size = random.Random(i + pos).randint(1, 16)
+                pieces.append(data[pos:pos + size])
+                pos += size
+
+        parser = IncrementalJSONParser()
+        events = []
+        for piece in pieces:
+            events += parser.feed(piece)
+        chunks += len(pieces)
+        if events != list(iter_events(document)) or parser.result() != document:
+            failures += 1
+    elapsed = time.perf_counter() - start
+    return {"stream_parser[200 documents]": {
+        "failures": failures, "chunks": chunks, "chunks_per_s": round(chunks / elapsed),
+    }}
+
+
+@scenario
+def llm_output(args):
+    """Respostas com defeito (cercas, vírgulas, cortes, campos faltando): JSON estrito x reparo local."""
+    import metrics
+    from llm_output import SCHEMAS, parse
+
+    results = {}
+    requests = 200
+    delay = args.llm_delay / 10
+    for kind in ("analysis", "roadmap"):
+        prompt = "roadmap" if kind == "roadmap" else "perfil"
+
+        # Como era: json.loads direto e, se falhar ou faltar campo, outra chamada completa
+        model = FakeModel(delay=delay, defect_rate=0.3, seed=3)
+        times, unrecovered = [], 0
+        for _ in range(requests):
+            start = time.perf_counter()
+            for _ in range(2):
+                try:
+                    document = json.loads(model.generate_content(prompt).text)
+                except ValueError:
+                    continue
+                if set(SCHEMAS[kind]["properties"]) <= set(document):
+                    break
+            else:
+                unrecovered += 1
+            times.append(time.perf_counter() - start)
+        results[f"llm_output[{kind},strict+full_retry]"] = summarize(
+            times, llm_calls=model.calls, incomplete=unrecovered, injected=model.injected,
+        )
+
+        # Agora: reparo local e, se precisar, uma nova chamada só com os campos que falharam
+        metrics.registry.reset()
+        model = FakeModel(delay=delay, defect_rate=0.3, seed=3)
+        ai = MentorAI(model=model)
+        generate = ai.generate_roadmap if kind == "roadmap" else ai.analyze_profile
+        times = []
+        for i in range(requests):
+            start = time.perf_counter()
+            generate(f"entrada {i}" if kind == "roadmap" else {"username": f"entrada {i}"})
+            times.append(time.perf_counter() - start)
+        outcomes = {dict(labels)["result"]: value for labels, value in metrics.registry.counters("llm_outputs_total").items()}
+        retries = sum(metrics.registry.counters("llm_section_retries_total").values())
+        results[f"llm_output[{kind},repair+section_retry]"] = summarize(
+            times, llm_calls=model.calls, section_retries=retries, incomplete=outcomes.get("failed", 0),
+            outcomes=outcomes, injected=model.injected,
+        )
+
+    # Custo do parse com reparo numa resposta cortada
+    text = json.dumps(FakeModel().roadmap, ensure_ascii=False, indent=2)
+    truncated = text[:int(len(text) * 0.8)]
+    loops = 2000
+    start = time.perf_counter()
+    for _ in range(loops):
+        parse(truncated, SCHEMAS["roadmap"])
+    results["llm_output[parse truncated roadmap]"] = {"mean_us": round((time.perf_counter() - start) / loops * 1e6, 1)}
+    return results
+
+
+@scenario
+def hedging(args):
+    """Gemini com cauda longa, travamentos e falhas: chamada direta x prazo, hedging, fallback e circuit breaker."""
+    import metrics
+    from benchmarks.fake_gemini import heavy_tail
+    from llm_client import HedgedClient
+
+    requests = 300
+    median = args.llm_delay / 15
+    deadline = 25 * median
+
+    def primary(failure_rate=0.03):
+        # 3% das chamadas travam por 50x a mediana e 3% falham com 503
+        delay = heavy_tail(median, stall_rate=0.03, stall=50 * median)
+        return FakeModel(delay=delay, failure_rate=failure_rate, seed=7, model_name="primary")
+
+    def light():
+        return FakeModel(delay=heavy_tail(0.6 * median, sigma=0.3), failure_rate=0.01, seed=8, model_name="light")
+
+    def client(model, fallback=None, **kwargs):
+        kwargs.setdefault("hedge_percentile", 95)
+        return HedgedClient(model, fallback, deadline=deadline, hedge_delay=3 * median, backoff=median, **kwargs)
+
+    def run(name, model, call, fallback=None):
+        metrics.registry.reset()
+        times, errors = [], {}
+        for _ in range(requests):
+            start = time.perf_counter()
+            try:
+                call()
+            except Exception as e:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            times.append(time.perf_counter() - start)
+        counters = metrics.registry.counters
+        results[f"hedging[{name}]"] = summarize(
+            times,
+            errors=errors,
+            primary_calls=model.calls,
+            fallback_calls=fallback.calls if fallback else 0,
+            hedges=sum(counters("llm_hedges_total").values()),
+            retries=sum(counters("llm_retries_total").values()),
+            circuit_opened=sum(counters("llm_circuit_open_total").values()),
+        )
+
+    results = {}
+    model = primary()
+    run("direct", model, lambda: model.generate_content("perfil"))
+
+    model = primary()
+    c = client(model, hedge_percentile=None)
+    run("deadline+retry", model, lambda: c.generate("bench", "perfil"))
+
+    model = primary()
+    c = client(model)
+    run("deadline+retry+hedge p95", model, lambda: c.generate("bench", "perfil"))
+
+    model, fallback = primary(), light()
+    c = client(model, fallback)
+    run("deadline+retry+hedge p95 to light model", model, lambda: c.generate("bench", "perfil"), fallback)
+
+    # Queda total do modelo principal: o circuit breaker manda tudo para o fallback ou recusa na hora
+    model, fallback = primary(failure_rate=1.0), light()
+    c = client(model, fallback, reset_timeout=0.5)
+    run("outage,breaker+fallback", model, lambda: c.generate("bench", "perfil"), fallback)
+
+    model = primary(failure_rate=1.0)
+    c = client(model, failure_threshold=10 ** 9)
+    run("outage,no breaker", model, lambda: c.generate("bench", "perfil"))
+
+    model = primary(failure_rate=1.0)
+    c = client(model, reset_timeout=0.5)
+    run("outage,breaker", model, lambda: c.generate("bench", "perfil"))
+    return results
+
+
+@scenario
+def flow(args):
+    """Fluxo completo: sequencial (como era o app) x pipeline com streaming."""
+    results = {}
+    with FakeGitHub(latency=args.latency) as github:
+        def sequential():
+            start = time.perf_counter()
+            ai = MentorAI(model=FakeModel(delay=args.llm_delay))
+            data = make_collector(github, "bench-50").collect_profile_data()
+            analyzed = SkillAnalyzer().analyze(data)
+            ai.analyze_profile(analyzed)
+            first = time.perf_counter() - start
+            ai.generate_roadmap("Backend Python")
+            return first, time.perf_counter() - start
+
+        def pipelined():
+            start = time.perf_counter()
+            ai = MentorAI(model=FakeModel(delay=args.llm_delay))
+            collector = make_collector(github, "bench-50")
+            pipeline = Pipeline(max_workers=3)
+            pipeline.add("roadmap", lambda: ai.stream_roadmap("Backend Python"))
+            pipeline.add("collect", collector.collect_profile_data)
+            pipeline.add("analyze", SkillAnalyzer().analyze, deps=("collect",))
+            pipeline.add("feedback", ai.stream_profile, deps=("analyze",))
+            first = None
+            for stage, event, _ in pipeline.run():
+                if first is None and stage in ("roadmap", "feedback"):
+                    first = time.perf_counter() - start
+            return first, time.perf_counter() - start
+
+        for name, fn in (("sequential", sequential), ("pipeline", pipelined)):
+            runs = [fn() for _ in range(args.iterations)]
+            tracemalloc.start()
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            first = summarize([r[0] for r in runs])
+            total = summarize([r[1] for r in runs], peak_kb=peak // 1024)
+            results[f"flow[{name}]"] = {
+                "time_to_first_section_p50_s": first["p50_s"],
+                "time_to_first_section_p90_s": first["p90_s"],
+                **{f"total_{k}": v for k, v in total.items()},
+            }
+    return results
+
+
+@scenario
+def startup(args):
+    """Import a frio dos módulos do app (em processo novo) e custo de um rerun do Streamlit."""
+    results = {}
+    code = "import github_collector, analyzer, mentor_ai, pipeline, cache, percentiles"
+    times = []
+    for _ in range(args.iterations):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+        times.append(time.perf_counter() - start)
+    results["startup[cold import]"] = summarize(times)
+
+    try:
+        from streamlit.testing.v1 import AppTest # type:ignore
+    except ImportError:
+        results["startup[rerun]"] = {"skipped": "streamlit não instalado"}
+        return results
+
+    app = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=60)
+    app.run()
+    times, _, _ = measure(app.run, args.iterations)
+    results["startup[rerun]"] = summarize(times)
+    return results
+
+
+@scenario
+def rerun(args):
+    """Rerun do Streamlit com a página de resultados já exibida (ex: abrir um caminho de carreira)."""
+    try:
+        from streamlit.testing.v1 import AppTest # type:ignore
+    except ImportError:
+        return {"rerun[results page]": {"skipped": "streamlit não instalado"}}
+
+    import mentor_ai
+
+    class FakeGenAI:
+        # O app cria o modelo por get_genai().GenerativeModel(...)
+        @staticmethod
+        def GenerativeModel(*args_, **kwargs):
+            return FakeModel(delay=args.llm_delay)
+
+    results = {}
+    original_genai, original_cwd = mentor_ai.get_genai, os.getcwd()
+    with FakeGitHub(latency=args.latency) as github, tempfile.TemporaryDirectory() as tmp:
+        os.environ["GITHUB_API_URL"] = github.url
+        mentor_ai.get_genai = lambda: FakeGenAI
+        os.chdir(tmp)  # caches em disco do app ficam no diretório temporário
+        try:
+            app = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=120)
+            app.run()
+            app.text_input[0].input("bench-30")
+            app.text_input[1].input("Backend Python")
+            app.button[0].click()
+            start = time.perf_counter()
+            app.run()
+            first = time.perf_counter() - start
+
+            times, _, _ = measure(app.run, args.iterations)
+            results["rerun[results page]"] = summarize(
+                times, first_run_s=round(first, 3), markdown_calls=len(app.markdown), exceptions=len(app.exception),
+            )
+
+            # Novo envio do mesmo pedido: vem da sessão, sem GitHub nem Gemini
+            github.reset_counters()
+            app.button[0].click()
+            start = time.perf_counter()
+            app.run()
+            results["rerun[same request resubmitted]"] = {
+                "time_s": round(time.perf_counter() - start, 6), "github_requests": github.requests,
+            }
+        finally:
+            os.chdir(original_cwd)
+            mentor_ai.get_genai = original_genai
+            del os.environ["GITHUB_API_URL"]
+    return results
+
+
+@scenario
+def jobs(args):
+    """Fila de jobs: pedidos simultâneos iguais viram um job só; fila limitada recusa o excedente."""
+    results = {}
+    with FakeGitHub(latency=args.latency) as github:
+        def build_pipeline(model):
+            ai = MentorAI(model=model)
+
+            def build(username, goal):
+                pipeline = Pipeline(max_workers=3)
+                pipeline.add("roadmap", lambda: ai.stream_roadmap(goal))
+                pipeline.add("collect", make_collector(github, username).collect_profile_data)
+                pipeline.add("analyze", SkillAnalyzer().analyze, deps=("collect",))
+                pipeline.add("feedback", ai.stream_profile, deps=("analyze",))
+                return pipeline
+            return build
+
+        # 40 sessões pedindo 4 análises distintas (com variações de caixa e espaços) ao mesmo tempo
+        submissions = [(f"bench-{20 + i % 4}", " Backend  Python" if i % 2 else "backend python") for i in range(40)]
+        for dedup in (False, True):
+            github.reset_counters()
+            model = FakeModel(delay=args.llm_delay)
+            build = build_pipeline(model)
+            queue = JobQueue(build, max_workers=4, max_pending=100)
+            barrier = threading.Barrier(len(submissions))
+            latencies = []
+
+            def session(username, goal):
+                barrier.wait()
+                start = time.perf_counter()
+                if dedup:
+                    job = queue.get(queue.submit(username, goal))
+                    cursor = 0
+                    while not (job.finished and cursor == len(job.events)):
+                        _, cursor = job.wait(cursor, timeout=1)
+                else:
+                    for _ in build(username, goal).run():
+                        pass
+                latencies.append(time.perf_counter() - start)
+
+            threads = [threading.Thread(target=session, args=r) for r in submissions]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            queue.shutdown()
+            results[f"jobs[40 sessions,4 distinct,{'single_flight' if dedup else 'no_dedup'}]"] = summarize(
+                latencies,
+                jobs=queue.stats()["done"] if dedup else len(submissions),
+                coalesced=queue.coalesced,
+                llm_calls=model.calls,
+                github_requests=github.requests,
+            )
+
+        # Fila limitada: 2 workers, no máximo 5 jobs pendentes, 8 pedidos distintos de uma vez
+        queue = JobQueue(build_pipeline(FakeModel(delay=args.llm_delay)), max_workers=2, max_pending=5)
+        accepted, rejected, max_running = [], 0, 0
+        for i in range(8):
+            try:
+                accepted.append(queue.submit(f"bench-{10 + i}", "Backend Python"))
+            except JobQueueFull:
+                rejected += 1
+        while any(not queue.get(job_id).finished for job_id in accepted):
+            max_running = max(max_running, queue.stats()["running"])
+            time.sleep(0.005)
+        queue.shutdown()
+        results["jobs[bounded,workers=2,max_pending=5,8 submits]"] = {
+            "accepted": len(accepted), "rejected": rejected, "max_running": max_running, **queue.stats(),
+        }
+    return results
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do Mentor IA de Carreira com GitHub e Gemini falsos.")
+    parser.add_argument("scenarios", nargs="*", help=f"cenários a rodar (padrão: todos): {', '.join(SCENARIOS)}")
+    parser.add_argument("-n", "--iterations", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.01, help="latência (s) de cada resposta do GitHub falso")
+    parser.add_argument("--llm-delay", type=float, default=0.3, help="tempo (s) de cada resposta do Gemini falso")
+    parser.add_argument("--profiles", type=int, default=10_000, help="perfis no cenário analyze_many (ex: 100000)")
+    parser.add_argument("--output", help="arquivo JSON de saída (padrão: stdout)")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"cenário desconhecido: {', '.join(unknown)}")
+
+    results = {}
+    for name in args.scenarios or SCENARIOS:
+        print(f"rodando {name}...", file=sys.stderr)
+        results.update(SCENARIOS[name](args))
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": args.iterations,
+            "github_latency_s": args.latency,
+            "llm_delay_s": args.llm_delay,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import metrics
+
+
+class DiskCache:
+    """
+    Cache persistente em disco, um arquivo JSON por chave.
+    Tem limite de entradas (despejo LRU) e TTL.
+    """
+
+    def __init__(self, directory, max_entries=1000, ttl=3600):
+        self.directory = directory
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        # Índice LRU em memória: o mtime do arquivo guarda o último acesso
+        self._index = OrderedDict()
+        files = []
+        for name in os.listdir(directory):
+            if name.endswith(".json"):
+                path = os.path.join(directory, name)
+                files.append((os.path.getmtime(path), name[:-5]))
+        for _, digest in sorted(files):
+            self._index[digest] = True
+        self._evict()
+
+    # -----------------------------
+    # API PÚBLICA
+    # -----------------------------
+
+    def get_entry(self, key):
+        """Retorna a entrada completa ({"value", "stored_at"}), mesmo se expirada."""
+        digest = self._digest(key)
+        with self._lock:
+            # O arquivo pode ter sido gravado por outra instância no mesmo diretório
+            try:
+                with open(self._path(digest), encoding="utf-8") as f:
+                    entry = json.load(f)
+            except FileNotFoundError:
+                self._index.pop(digest, None)
+                return None
+            except (OSError, ValueError):
+                self._remove(digest)
+                return None
+            self._index[digest] = True
+            self._index.move_to_end(digest)
+            self._touch_file(digest)
+            return entry
+
+    def get(self, key):
+        """Retorna o valor se a entrada existir e ainda estiver dentro do TTL."""
+        entry = self.get_entry(key)
+        if entry is None or not self.is_fresh(entry):
+            return None
+        return entry["value"]
+
+    def set(self, key, value):
+        digest = self._digest(key)
+        entry = {"key": key, "stored_at": time.time(), "value": value}
+        with self._lock:
+            self._write(digest, entry)
+            self._index[digest] = True
+            self._index.move_to_end(digest)
+            self._evict()
+
+    def touch(self, key):
+        """Renova o TTL de uma entrada existente (ex: após uma revalidação)."""
+        entry = self.get_entry(key)
+        if entry is not None:
+            self.set(key, entry["value"])
+
+    def delete(self, key):
+        with self._lock:
+            self._remove(self._digest(key))
+
+    def is_fresh(self, entry):
+        if self.ttl is None:
+            return True
+        return time.time() - entry.get("stored_at", 0) < self.ttl
+
+    def __len__(self):
+        return len(self._index)
+
+    # -----------------------------
+    # SUPORTE
+    # -----------------------------
+
+    def _digest(self, key):
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _path(self, digest):
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def _write(self, digest, entry):
+        # Escrita atômica para não deixar arquivos pela metade
+        path = self._path(digest)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def _touch_file(self, digest):
+        try:
+            os.utime(self._path(digest))
+        except OSError:
+            pass
+
+    def _remove(self, digest):
+        self._index.pop(digest, None)
+        try:
+            os.remove(self._path(digest))
+        except OSError:
+            pass
+
+    def _evict(self):
+        while len(self._index) > self.max_entries:
+            oldest = next(iter(self._index))
+            self._remove(oldest)
+
+
+class HTTPCache(DiskCache):
+    """
+    Cache de respostas HTTP com ETag/Last-Modified para requisições condicionais.
+    Respostas 304 do GitHub não consomem o rate limit.
+    """
+
+    def __init__(self, directory, max_entries=5000, ttl=300):
+        super().__init__(directory, max_entries=max_entries, ttl=ttl)
+        self.hits = 0           # servido do disco sem tocar na rede
+        self.misses = 0         # baixado por completo (200)
+        self.revalidations = 0  # confirmado pelo servidor com 304
+        self._counter_lock = threading.Lock()
+
+    def record(self, kind):
+        with self._counter_lock:
+            setattr(self, kind, getattr(self, kind) + 1)
+        metrics.inc("http_cache_total", result=kind)
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "entries": len(self),
+        }
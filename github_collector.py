@@ -1,67 +1,419 @@
 import requests # type:ignore
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import metrics
+from http_transport import get_transport
+from rate_limiter import get_scheduler
+from repo_files import NO_FILES, summarize_tree
+
+# Resultado de uma busca que falhou (5xx, 403 de rate limit, 451...): diferente de
+# "sem commits" ou "sem arquivos", não pode ir para o snapshot
+FAILED = object()
+
+class RepoRecord:
+    """
+    Só os campos de um repo que a análise usa. O JSON da API traz ~100 campos
+    (com owner e license aninhados) por repo; guardar só isto reduz muito a
+    memória de perfis grandes e de várias sessões/lotes simultâneos.
+    """
+
+    __slots__ = ("name", "language", "size", "open_issues_count", "pushed_at", "default_branch")
+
+    def __init__(self, name, language=None, size=0, open_issues_count=0, pushed_at=None, default_branch=None):
+        self.name = name
+        self.language = language
+        self.size = size
+        self.open_issues_count = open_issues_count
+        self.pushed_at = pushed_at
+        self.default_branch = default_branch
+
+    @classmethod
+    def from_api(cls, repo):
+        language = repo.get("language")
+        return cls(
+            repo.get("name"),
+            # Poucas linguagens distintas: a mesma string é compartilhada entre todos os repos
+            sys.intern(language) if language else language,
+            repo.get("size", 0),
+            repo.get("open_issues_count", 0),
+            repo.get("pushed_at"),
+            repo.get("default_branch"),
+        )
+
+    def __repr__(self):
+        return f"RepoRecord({self.name!r}, language={self.language!r})"
+
+
+def compact_repos(page):
+    """Reduz uma página da listagem de repos aos campos de RepoRecord (para o HTTPCache)."""
+    if not isinstance(page, list):
+        return page
+    return [
+        {field: repo[field] for field in RepoRecord.__slots__ if field in repo}
+        for repo in page if isinstance(repo, dict)
+    ]
+
+
+class CachedResponse:
+    """Resposta servida a partir do HTTPCache, com a mesma interface usada do requests."""
+
+    def __init__(self, entry, status_code=200):
+        self.status_code = status_code
+        self._body = entry["body"]
+        self.headers = {k: v for k, v in entry.get("headers", {}).items() if v}
+
+    def json(self):
+        return self._body
+
+    @property
+    def links(self):
+        link = self.headers.get("Link")
+        if not link:
+            return {}
+        return {l.get("rel") or l.get("url"): l for l in requests.utils.parse_header_links(link)}
+
 
 class GitHubCollector:
-    def __init__(self, username):
+    def __init__(self, username, max_workers=8, cache=None, stats_deadline=20, stats_backoff=1.0,
+                 scheduler=None, api_url="https://api.github.com", snapshots=None, transport=None):
         self.username = username
-        self.base_url = f"https://api.github.com/users/{username}"
+        self.api_url = api_url.rstrip("/")
+        self.base_url = f"{self.api_url}/users/{username}"
+        # Limite de requisições simultâneas ao buscar a atividade dos repos (1 = serial)
+        self.max_workers = max(1, int(max_workers))
+        # Prazo total (s) e intervalo inicial do re-polling de repos com estatísticas em cálculo (202)
+        self.stats_deadline = stats_deadline
+        self.stats_backoff = stats_backoff
+        self.per_page = 100
 
-    def get_repos(self):
+        # Lista de repos baixada uma única vez por perfil
+        self._repos = None
+        # Quantidade de requisições HTTP feitas por este coletor
+        self.request_count = 0
+        self._lock = threading.Lock()
+
+        # HTTPCache opcional: guarda corpo + ETag e faz requisições condicionais
+        self.cache = cache
+        # Agendador da cota REST ("core") do GitHub, compartilhado pelo processo inteiro
+        self.scheduler = scheduler or get_scheduler("core")
+        # Pool de conexões (keep-alive, timeouts, retry em 5xx) compartilhado pelo processo
+        self.transport = transport or get_transport()
+        # DiskCache opcional com o último snapshot do perfil (pushed_at + atividade de cada repo):
+        # numa nova coleta, só os repos com push desde então têm a atividade buscada de novo
+        self.snapshots = snapshots
+
+    def _get(self, url, params=None, transform=None):
+        """
+        Faz o GET (condicional, se houver cache) e contabiliza a requisição.
+        transform, se informado, reduz o corpo antes de ir para o cache.
+        """
+        if self.cache is None:
+            return self._request(url, params=params)
+
+        key = requests.Request("GET", url, params=params).prepare().url
+        entry = self.cache.get_entry(key)
+        if entry is not None and self.cache.is_fresh(entry):
+            self.cache.record("hits")
+            return CachedResponse(entry["value"])
+
+        headers = {}
+        if entry is not None:
+            cached = entry["value"].get("headers", {})
+            if cached.get("ETag"):
+                headers["If-None-Match"] = cached["ETag"]
+            if cached.get("Last-Modified"):
+                headers["If-Modified-Since"] = cached["Last-Modified"]
+
+        r = self._request(key, headers=headers)
+
+        if r.status_code == 304 and entry is not None:
+            self.cache.record("revalidations")
+            self.cache.touch(key)
+            return CachedResponse(entry["value"])
+
+        self.cache.record("misses")
+        # Só respostas completas são guardadas (202 ainda está sendo calculado).
+        # O corpo é decodificado uma única vez e servido a partir do que foi guardado.
+        if r.status_code == 200:
+            body = r.json()
+            value = {
+                "body": transform(body) if transform else body,
+                "headers": {name: r.headers.get(name) for name in ("ETag", "Last-Modified", "Link")},
+            }
+            self.cache.set(key, value)
+            return CachedResponse(value)
+        return r
+
+    def _request(self, url, params=None, headers=None):
+        """Envia a requisição respeitando o rate limit; se for recusada por limite, espera e tenta de novo."""
+        for attempt in range(2):
+            # Espera pela cota (ou levanta RateLimitExceeded com o tempo estimado)
+            self.scheduler.acquire()
+            with self._lock:
+                self.request_count += 1
+            if attempt:
+                metrics.inc("http_retries_total", backend="rest", reason="rate_limit")
+            try:
+                r = self.transport.get(url, params=params, headers=headers)
+            except Exception:
+                self.scheduler.release()
+                raise
+            metrics.inc("http_requests_total", backend="rest", status=r.status_code)
+            self.scheduler.update(r.status_code, r.headers)
+            if not self.scheduler.is_rate_limited(r.status_code, r.headers):
+                break
+        return r
+
+    def iter_repos(self):
+        """Percorre os repos página a página, seguindo o header Link, como RepoRecord."""
         url = f"{self.base_url}/repos"
-        r = requests.get(url)
-        return r.json()
+        params = {"per_page": self.per_page}
+        while url:
+            r = self._get(url, params=params, transform=compact_repos)
+            page = r.json()
+            if not isinstance(page, list):
+                message = page.get("message") if isinstance(page, dict) else page
+                raise ValueError(f"Não foi possível listar os repositórios de '{self.username}': {message}")
 
-    def get_languages(self):
-        repos = self.get_repos()
+            # O JSON completo da página é descartado assim que vira RepoRecord
+            yield from map(RepoRecord.from_api, page)
+
+            # A URL de "next" já traz os parâmetros de paginação
+            url = r.links.get("next", {}).get("url")
+            params = None
+
+    @metrics.timed("github.get_repos")
+    def get_repos(self):
+        if self._repos is None:
+            self._repos = list(self.iter_repos())
+        return self._repos
+
+    def get_languages(self, repos=None):
+        if repos is None:
+            repos = self.get_repos()
         languages = {}
         for repo in repos:
-            lang = repo.get("language")
+            lang = repo.language
             if lang:
                 languages[lang] = languages.get(lang, 0) + 1
         return languages
 
-    def get_commit_activity(self, repo_name):
-        """Retorna commits semanais para cada repo."""
-        url = f"https://api.github.com/repos/{self.username}/{repo_name}/stats/commit_activity"
-        r = requests.get(url)
+    @metrics.timed("github.get_commit_activity")
+    def get_weekly_activity(self, repo_name):
+        """
+        Commits semanais do repo como WeeklyActivity (com a data de cada semana),
+        None se o GitHub ainda estiver calculando ou FAILED se a requisição falhar.
+        """
+        from activity import WeeklyActivity
+
+        url = f"{self.api_url}/repos/{self.username}/{repo_name}/stats/commit_activity"
+        r = self._get(url)
+
+        # 202: as estatísticas estão sendo calculadas, é preciso consultar de novo depois
+        if r.status_code == 202:
+            return None
+        # 204: repo vazio
+        if r.status_code == 204:
+            return WeeklyActivity(0, [])
+        if r.status_code != 200:
+            metrics.inc("github_repo_data_failures_total", kind="activity", status=r.status_code)
+            return FAILED
+
         data = r.json()
 
         # Quando a API estiver processando, ela retorna None
         if not data or not isinstance(data, list):
-            return []
+            return WeeklyActivity(0, [])
+
+        return WeeklyActivity.from_stats(data)
+
+    def get_commit_activity(self, repo_name):
+        """Retorna commits semanais para cada repo, ou None se o GitHub ainda estiver calculando (ou falhar)."""
+        weekly = self.get_weekly_activity(repo_name)
+        return None if weekly is None or weekly is FAILED else weekly.tolist()
+
+    @metrics.timed("github.fetch_commit_activity")
+    def fetch_commit_activity(self, repo_names):
+        """
+        Busca a atividade semanal de vários repos com um pool limitado de threads.
+        Os repos que respondem 202 são re-consultados juntos, em rodadas com backoff
+        exponencial, até o prazo final. Os que falham não são re-consultados.
+        Retorna (WeeklyActivity por repo, repos ainda pendentes ou que falharam).
+        """
+        deadline = time.monotonic() + self.stats_deadline
+        delay = self.stats_backoff
+        results = {}
+        failed = set()
+        pending = list(repo_names)
+
+        workers = min(self.max_workers, max(len(repo_names), 1))
+        fetch = metrics.bind(self.get_weekly_activity)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while pending:
+                still_pending = []
+                for name, weekly in zip(pending, pool.map(fetch, pending)):
+                    if weekly is None:
+                        still_pending.append(name)
+                    elif weekly is FAILED:
+                        failed.add(name)
+                    else:
+                        results[name] = weekly
+                pending = still_pending
+
+                remaining = deadline - time.monotonic()
+                if not pending or remaining <= 0:
+                    break
+                time.sleep(min(delay, remaining))
+                delay *= 2
+                metrics.inc("github_stats_repolls_total", len(pending))
+
+        # Na ordem dos repos
+        pending = set(pending) | failed
+        return results, [name for name in repo_names if name in pending]
+
+    @metrics.timed("github.get_repo_files")
+    def get_repo_files(self, repo):
+        """
+        README, testes e CI do repo, detectados pelos caminhos da árvore git do branch
+        padrão numa única chamada recursiva. Retorna {"sha", "has_readme", "has_tests", "has_ci"},
+        ou FAILED se a requisição falhar.
+        """
+        ref = repo.default_branch or "HEAD"
+        url = f"{self.api_url}/repos/{self.username}/{repo.name}/git/trees/{ref}"
+        # No HTTPCache fica só o resumo, não a lista de arquivos
+        r = self._get(url, params={"recursive": 1}, transform=summarize_tree)
 
-        # Extrai apenas o número de commits semanais
-        return [week["total"] for week in data]
+        # 409: repo vazio; 404: sem acesso ou branch inexistente
+        if r.status_code in (404, 409):
+            return {"sha": None, **NO_FILES}
+        if r.status_code != 200:
+            metrics.inc("github_repo_data_failures_total", kind="tree", status=r.status_code)
+            return FAILED
+        return summarize_tree(r.json())
 
-    def extract_repo_details(self, repo):
+    @metrics.timed("github.fetch_repo_files")
+    def fetch_repo_files(self, repos):
+        """Busca a árvore de vários repos em paralelo. Retorna {nome: arquivos detectados ou FAILED}."""
+        workers = min(self.max_workers, max(len(repos), 1))
+        fetch = metrics.bind(self.get_repo_files)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return {repo.name: files for repo, files in zip(repos, pool.map(fetch, repos))}
+
+    def fetch_repo_data(self, repos):
+        """
+        Atividade semanal e arquivos de cada repo, com as duas buscas rodando ao mesmo tempo.
+        Retorna (atividade por repo, arquivos por repo, repos incompletos). Um repo fica
+        incompleto com a atividade ainda em cálculo ou com alguma das buscas falhando;
+        os arquivos que falharam ficam fora de "arquivos por repo".
+        """
+        with ThreadPoolExecutor(max_workers=1) as side:
+            future = side.submit(metrics.bind(self.fetch_repo_files), repos)
+            weekly_by_repo, pending_repos = self.fetch_commit_activity([r.name for r in repos])
+            files = future.result()
+        failed = {name for name, found in files.items() if found is FAILED}
+        pending = set(pending_repos) | failed
+        files_by_repo = {name: found for name, found in files.items() if name not in failed}
+        return weekly_by_repo, files_by_repo, [r.name for r in repos if r.name in pending]
+
+    def extract_repo_details(self, repo, files=None):
         """Extrai dados importantes para análise qualitativa de cada repo."""
+        files = files or NO_FILES
         return {
-            "name": repo.get("name"),
-            "size": repo.get("size", 0),  # tamanho do repositório
-            "open_issues_count": repo.get("open_issues_count", 0),
-            "has_readme": repo.get("has_downloads", False),  # aproximado
-            "has_tests": any("test" in repo.get("name", "").lower() for _ in range(1)),  # heurística
+            "name": repo.name,
+            "size": repo.size,  # tamanho do repositório
+            "open_issues_count": repo.open_issues_count,
+            "has_readme": files["has_readme"],
+            "has_tests": files["has_tests"],
+            "has_ci": files["has_ci"],
         }
 
+    def _snapshot_key(self):
+        return f"profile|{self.api_url}|{self.username.lower()}"
+
+    def load_snapshot(self):
+        """Repos do último snapshot salvo: {nome: {"pushed_at", "activity", "files"}}."""
+        if self.snapshots is None:
+            return {}
+        snapshot = self.snapshots.get(self._snapshot_key())
+        return snapshot.get("repos", {}) if snapshot else {}
+
+    def refresh_repo_data(self, repos):
+        """
+        Como fetch_repo_data, mas buscando na API só os repos novos ou com pushed_at
+        diferente do snapshot; os demais vêm do que foi salvo (atividade e árvore).
+        """
+        from activity import WeeklyActivity
+
+        previous = self.load_snapshot()
+
+        changed = []
+        for repo in repos:
+            stored = previous.get(repo.name)
+            # Snapshots de versões anteriores (sem arquivos ou com a atividade em lista) são refeitos
+            if stored is None or stored["pushed_at"] != repo.pushed_at or "files" not in stored or "activity" not in stored:
+                changed.append(repo)
+        metrics.inc("github_snapshot_repos_total", len(repos) - len(changed), result="reused")
+        metrics.inc("github_snapshot_repos_total", len(changed), result="fetched")
+
+        fetched, files_by_repo, pending_repos = self.fetch_repo_data(changed)
+        pending = set(pending_repos)
+
+        # Repos apagados somem do snapshot porque ele é reconstruído a partir da lista atual.
+        # Só buscas completas entram no snapshot: um repo pendente (202 no prazo, erro da API)
+        # mantém a entrada anterior, com o pushed_at antigo, e é buscado de novo na próxima coleta.
+        entries = {}
+        for repo in repos:
+            name = repo.name
+            stored = previous.get(name)
+            if name in fetched and name not in pending:
+                # A atividade vai em binário compacto (base64), com a data da primeira semana
+                entries[name] = {"pushed_at": repo.pushed_at, "activity": fetched[name].to_base64(),
+                                 "files": files_by_repo[name]}
+            elif stored is not None and "files" in stored and "activity" in stored:
+                entries[name] = stored
+                files_by_repo.setdefault(name, stored["files"])
+
+        if self.snapshots is not None:
+            self.snapshots.set(self._snapshot_key(), {"repos": entries})
+
+        weekly_by_repo = {name: WeeklyActivity.from_base64(entry["activity"]) for name, entry in entries.items()}
+        # Atividade buscada agora vale mais que a do snapshot, mesmo se a árvore do repo falhou
+        weekly_by_repo.update(fetched)
+        return weekly_by_repo, files_by_repo, pending_repos
+
+    @metrics.timed("github.collect_profile_data")
     def collect_profile_data(self):
+        # Uma única passada pela lista de repos alimenta linguagens, detalhes e atividade
         repos = self.get_repos()
 
-        detailed_repos = [self.extract_repo_details(r) for r in repos]
+        languages = self.get_languages(repos)
 
-        # Somar atividades semanais de todos os repositórios
-        activity = []
-        for r in repos:
-            weekly = self.get_commit_activity(r["name"])
-            if weekly:
-                activity.append(weekly)
+        # Atividade e árvore de arquivos de cada repo, buscadas em paralelo.
+        # A soma das atividades segue a ordem dos repos, então o resultado é o mesmo do caminho serial.
+        names = [r.name for r in repos]
+        if self.snapshots is not None:
+            weekly_by_repo, files_by_repo, pending_repos = self.refresh_repo_data(repos)
+        else:
+            weekly_by_repo, files_by_repo, pending_repos = self.fetch_repo_data(repos)
+        detailed_repos = [self.extract_repo_details(r, files_by_repo.get(r.name)) for r in repos]
 
-        # Achatar: soma commits de todos os repos por semana
-        combined_activity = []
-        if activity:
-            weeks = zip(*activity)
-            combined_activity = [sum(week) for week in weeks]
+        # Soma commits de todos os repos por semana, alinhando pelas datas, até a semana atual
+        # (repos reaproveitados do snapshot podem ter parado de receber commits há semanas)
+        from activity import WeeklyActivity, week_start
+        combined = WeeklyActivity.merge(
+            [weekly_by_repo[name] for name in names if name in weekly_by_repo],
+            end=week_start(time.time()),
+        )
 
         return {
-            "languages": self.get_languages(),
+            "languages": languages,
             "repos": detailed_repos,
-            "activity": combined_activity,
+            "activity": combined.tolist(),
+            # Timestamp da primeira semana de "activity" (domingo 00:00 UTC)
+            "activity_start": combined.start if len(combined) else None,
+            # Repos cujas estatísticas ainda estavam em cálculo no prazo final ou cuja busca falhou:
+            # se não estiver vazio, a atividade e os detalhes acima são parciais
+            "pending_repos": pending_repos,
         }
\ No newline at end of file
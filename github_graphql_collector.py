@@ -0,0 +1,152 @@
+import os
+from datetime import datetime, timezone
+
+import metrics
+from http_transport import get_transport
+from rate_limiter import get_scheduler
+from repo_files import detect
+
+# Uma página de repositórios por chamada; o calendário de contribuições vem só na primeira
+PROFILE_QUERY = """
+query($login: String!, $cursor: String, $withCalendar: Boolean!) {
+  user(login: $login) {
+    repositories(first: 100, after: $cursor, ownerAffiliations: OWNER, orderBy: {field: PUSHED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        name
+        diskUsage
+        primaryLanguage { name }
+        issues(states: OPEN) { totalCount }
+        pullRequests(states: OPEN) { totalCount }
+        root: object(expression: "HEAD:") { ... on Tree { oid entries { name } } }
+        workflows: object(expression: "HEAD:.github/workflows") { ... on Tree { entries { name } } }
+      }
+    }
+    contributionsCollection @include(if: $withCalendar) {
+      contributionCalendar {
+        weeks { firstDay contributionDays { contributionCount } }
+      }
+    }
+  }
+}
+"""
+
+
+def first_day_timestamp(first_day):
+    """Timestamp do início da semana de um firstDay do calendário ("AAAA-MM-DD", semanas começam no domingo)."""
+    from activity import week_start
+    day = datetime.strptime(first_day, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    return week_start(day.timestamp())
+
+
+class GitHubGraphQLCollector:
+    """
+    Backend alternativo ao GitHubCollector usando a API GraphQL do GitHub.
+    Monta o mesmo payload de collect_profile_data com poucas consultas paginadas
+    (uma a cada 100 repos), em vez de 1 + N chamadas REST. Exige token.
+
+    A atividade vem do calendário de contribuições do usuário (commits, PRs,
+    issues e reviews por semana), não da soma de commits de cada repo.
+    """
+
+    def __init__(self, username, token=None, api_url="https://api.github.com/graphql", scheduler=None,
+                 transport=None):
+        self.username = username
+        self.api_url = api_url
+        self.token = token or os.getenv("GITHUB_TOKEN")
+        if not self.token:
+            raise ValueError("O backend GraphQL precisa de um token: defina 'GITHUB_TOKEN' no .env")
+
+        # Quantidade de requisições HTTP feitas por este coletor
+        self.request_count = 0
+        # Agendador da cota GraphQL ("graphql") do GitHub, compartilhado pelo processo inteiro
+        self.scheduler = scheduler or get_scheduler("graphql")
+        # Pool de conexões (keep-alive, timeouts, retry em 5xx) compartilhado pelo processo
+        self.transport = transport or get_transport()
+
+    def _query(self, variables):
+        for attempt in range(2):
+            self.scheduler.acquire()
+            self.request_count += 1
+            if attempt:
+                metrics.inc("http_retries_total", backend="graphql", reason="rate_limit")
+            try:
+                r = self.transport.post(
+                    self.api_url,
+                    json={"query": PROFILE_QUERY, "variables": variables},
+                    headers={"Authorization": f"bearer {self.token}"},
+                )
+            except Exception:
+                self.scheduler.release()
+                raise
+            metrics.inc("http_requests_total", backend="graphql", status=r.status_code)
+            self.scheduler.update(r.status_code, r.headers)
+            if not self.scheduler.is_rate_limited(r.status_code, r.headers):
+                break
+
+        body = r.json()
+        if body.get("errors"):
+            messages = "; ".join(e.get("message", "") for e in body["errors"])
+            raise ValueError(f"Erro na consulta GraphQL de '{self.username}': {messages}")
+        if not body.get("data", {}).get("user"):
+            raise ValueError(f"Usuário '{self.username}' não encontrado")
+        return body["data"]["user"]
+
+    def iter_pages(self):
+        """Percorre as páginas de repositórios pelo cursor."""
+        cursor = None
+        first = True
+        while True:
+            user = self._query({"login": self.username, "cursor": cursor, "withCalendar": first})
+            yield user
+            page_info = user["repositories"]["pageInfo"]
+            if not page_info["hasNextPage"]:
+                break
+            cursor = page_info["endCursor"]
+            first = False
+
+    def extract_repo_details(self, node):
+        """
+        Extrai os mesmos campos que o GitHubCollector REST. Aqui só a raiz da árvore
+        e a pasta de workflows vêm na consulta, então testes fora da raiz não são vistos.
+        """
+        paths = [entry["name"] for entry in (node.get("root") or {}).get("entries", [])]
+        paths += [f".github/workflows/{entry['name']}" for entry in (node.get("workflows") or {}).get("entries", [])]
+        return {
+            "name": node.get("name") or "",
+            "size": node.get("diskUsage") or 0,  # KB, como o "size" da API REST
+            # A API REST soma issues e PRs abertos em open_issues_count
+            "open_issues_count": node["issues"]["totalCount"] + node["pullRequests"]["totalCount"],
+            **detect(paths),
+        }
+
+    @metrics.timed("github.collect_profile_data")
+    def collect_profile_data(self):
+        languages = {}
+        detailed_repos = []
+        combined_activity = []
+        activity_start = None
+
+        for user in self.iter_pages():
+            for node in user["repositories"]["nodes"]:
+                lang = (node.get("primaryLanguage") or {}).get("name")
+                if lang:
+                    languages[lang] = languages.get(lang, 0) + 1
+                detailed_repos.append(self.extract_repo_details(node))
+
+            calendar = user.get("contributionsCollection")
+            if calendar:
+                weeks = calendar["contributionCalendar"]["weeks"]
+                combined_activity = [sum(day["contributionCount"] for day in week["contributionDays"]) for week in weeks]
+                if weeks:
+                    activity_start = first_day_timestamp(weeks[0]["firstDay"])
+
+        return {
+            "languages": languages,
+            "repos": detailed_repos,
+            "activity": combined_activity,
+            # Timestamp da primeira semana de "activity" (domingo 00:00 UTC), como no coletor REST
+            "activity_start": activity_start,
+            # O calendário não depende de estatísticas calculadas sob demanda
+            "pending_repos": [],
+        }
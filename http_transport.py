@@ -0,0 +1,94 @@
+"""
+Transporte HTTP compartilhado pelos coletores: pool de conexões com keep-alive,
+respostas comprimidas, timeouts de conexão/leitura e nova tentativa em erros
+transitórios (5xx e falhas de conexão).
+
+Por padrão usa requests.Session. Com http2=True (ou GITHUB_HTTP2=1) usa o httpx,
+que precisa estar instalado com suporte a HTTP/2 (pip install "httpx[http2]").
+"""
+
+import os
+import threading
+import time
+
+import requests # type:ignore
+from requests.adapters import HTTPAdapter # type:ignore
+
+import metrics
+
+RETRY_STATUSES = (500, 502, 503, 504)
+
+
+class Transport:
+    def __init__(self, pool_size=32, connect_timeout=5, read_timeout=30, retries=2, backoff=0.5,
+                 http2=False, verify=True):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        # Novas tentativas em 5xx e falhas de conexão, com espera dobrando a cada uma
+        self.retries = retries
+        self.backoff = backoff
+        self.http2 = http2
+        self.headers = {"Accept-Encoding": "gzip, deflate"}
+
+        if http2:
+            import httpx # type:ignore
+            self._client = httpx.Client(
+                http2=True,
+                verify=verify,
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            )
+            self._transient_errors = (httpx.TransportError,)
+        else:
+            self._client = requests.Session()
+            # Passado em cada chamada: na Session, REQUESTS_CA_BUNDLE teria prioridade sobre ele
+            self.verify = verify
+            # Uma conexão por thread do pool do coletor, reaproveitada entre requisições
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+            self._client.mount("https://", adapter)
+            self._client.mount("http://", adapter)
+            self._transient_errors = (requests.ConnectionError, requests.Timeout)
+
+    def get(self, url, params=None, headers=None):
+        return self.request("GET", url, params=params, headers=headers)
+
+    def post(self, url, json=None, headers=None):
+        return self.request("POST", url, json=json, headers=headers)
+
+    def request(self, method, url, headers=None, **kwargs):
+        headers = {**self.headers, **(headers or {})}
+        if not self.http2:
+            # No httpx timeouts e certificados já ficam configurados no cliente
+            kwargs["timeout"] = (self.connect_timeout, self.read_timeout)
+            kwargs["verify"] = self.verify
+        delay = self.backoff
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            try:
+                r = self._client.request(method, url, headers=headers, **kwargs)
+            except self._transient_errors:
+                if last:
+                    raise
+                metrics.inc("http_retries_total", reason="connection")
+            else:
+                if r.status_code not in RETRY_STATUSES or last:
+                    return r
+                metrics.inc("http_retries_total", reason="5xx")
+            time.sleep(delay)
+            delay *= 2
+
+    def close(self):
+        self._client.close()
+
+
+_default_transport = None
+_default_lock = threading.Lock()
+
+
+def get_transport():
+    """Transporte único do processo: as conexões ficam abertas entre sessões e coletas."""
+    global _default_transport
+    with _default_lock:
+        if _default_transport is None:
+            _default_transport = Transport(http2=os.getenv("GITHUB_HTTP2", "").lower() in ("1", "true"))
+        return _default_transport
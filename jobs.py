@@ -0,0 +1,161 @@
+"""
+Fila de análises em segundo plano.
+
+submit() devolve o id de um job e a análise roda num pool limitado de workers,
+fora do script do Streamlit. Pedidos iguais (mesmo usuário e objetivo) feitos
+enquanto um job ainda está na fila ou rodando recebem o id desse mesmo job, em
+vez de repetir as chamadas ao GitHub e ao Gemini (single-flight).
+
+Quem acompanha o job lê os eventos do pipeline a partir de um cursor, então
+dá para reconectar (ex: num rerun do Streamlit) e receber tudo de novo.
+"""
+
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+from mentor_ai import normalize_goal
+
+
+class JobQueueFull(Exception):
+    def __init__(self, limit):
+        super().__init__(f"Muitas análises na fila ({limit}). Tente novamente em alguns instantes.")
+        self.limit = limit
+
+
+class Job:
+    def __init__(self, job_id, key, username, goal):
+        self.id = job_id
+        self.key = key
+        self.username = username
+        self.goal = goal
+        self.status = "queued"  # queued -> running -> done | error
+        self.events = []        # (etapa, evento, valor), na ordem do Pipeline.run
+        self.results = {}       # resultado final de cada etapa concluída
+        self.error = None
+        self.trace = None
+        self.subscribers = 1
+        self.created_at = time.time()
+        self.finished_at = None
+        self._cond = threading.Condition()
+
+    @property
+    def finished(self):
+        return self.status in ("done", "error")
+
+    def publish(self, stage, event, value):
+        with self._cond:
+            self.events.append((stage, event, value))
+            if event == "done":
+                self.results[stage] = value
+            self._cond.notify_all()
+
+    def finish(self, error=None):
+        with self._cond:
+            self.status = "error" if error is not None else "done"
+            self.error = error
+            self.finished_at = time.time()
+            self._cond.notify_all()
+
+    def wait(self, cursor, timeout=None):
+        """
+        Espera até haver eventos depois de `cursor` (ou o job terminar) e os devolve
+        junto com o novo cursor.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: len(self.events) > cursor or self.finished, timeout)
+            return self.events[cursor:], len(self.events)
+
+
+class JobQueue:
+    """
+    build_pipeline(username, goal) monta o Pipeline de uma análise; cada job
+    consome o pipeline.run() e publica os eventos no Job.
+    """
+
+    def __init__(self, build_pipeline, max_workers=4, max_pending=50, keep_finished=600):
+        self.build_pipeline = build_pipeline
+        self.max_workers = max_workers
+        # Jobs na fila ou rodando; acima disso submit() recusa com JobQueueFull
+        self.max_pending = max_pending
+        # Por quanto tempo (s) um job terminado continua disponível para consulta
+        self.keep_finished = keep_finished
+
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._jobs = {}      # id -> Job
+        self._inflight = {}  # chave -> Job ainda não terminado
+        self.coalesced = 0
+
+    @staticmethod
+    def job_key(username, goal):
+        return (username.strip().lower(), normalize_goal(goal))
+
+    def submit(self, username, goal):
+        """Enfileira a análise e devolve o id do job (o de um job igual em andamento, se houver)."""
+        key = self.job_key(username, goal)
+        with self._lock:
+            self._prune()
+            job = self._inflight.get(key)
+            if job is not None:
+                job.subscribers += 1
+                self.coalesced += 1
+                metrics.inc("jobs_total", result="coalesced")
+                return job.id
+
+            if len(self._inflight) >= self.max_pending:
+                metrics.inc("jobs_total", result="rejected")
+                raise JobQueueFull(self.max_pending)
+
+            job = Job(f"job-{next(self._ids)}", key, username.strip(), goal)
+            self._jobs[job.id] = job
+            self._inflight[key] = job
+            metrics.inc("jobs_total", result="submitted")
+        self._pool.submit(self._run, job)
+        return job.id
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+            return {
+                "queued": statuses.count("queued"),
+                "running": statuses.count("running"),
+                "done": statuses.count("done"),
+                "error": statuses.count("error"),
+                "coalesced": self.coalesced,
+            }
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
+
+    def _run(self, job):
+        job.status = "running"
+        error = None
+        try:
+            with metrics.trace() as trace:
+                job.trace = trace
+                with metrics.span("job"):
+                    for stage, event, value in self.build_pipeline(job.username, job.goal).run():
+                        job.publish(stage, event, value)
+        except Exception as e:
+            error = e
+        finally:
+            # Sai do single-flight antes de avisar quem espera: um novo pedido igual gera outro job
+            with self._lock:
+                if self._inflight.get(job.key) is job:
+                    del self._inflight[job.key]
+            job.finish(error)
+            metrics.inc("jobs_finished_total", status=job.status)
+
+    def _prune(self):
+        cutoff = time.time() - self.keep_finished
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and job.finished_at < cutoff:
+                del self._jobs[job_id]
@@ -0,0 +1,120 @@
+import codecs
+import json
+
+
+class IncrementalJSONParser:
+    """
+    Parser incremental para o objeto JSON que o Gemini devolve em partes.
+    A cada feed() retorna os eventos que ficaram completos:
+      (("campo",), valor)       -> campo de primeiro nível terminado
+      (("campo", i), item)      -> item i de um campo de primeiro nível que é lista
+    Os pedaços podem ser cortados em qualquer ponto, inclusive no meio de um
+    caractere UTF-8 quando chegam como bytes.
+    """
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+
+        self._expect = None        # "key", "colon", "value" ou "in_value" no primeiro nível
+        self._key = None
+        self._value_start = None
+        self._value_is_array = False
+        self._item_start = None
+        self._item_index = 0
+
+    def feed(self, chunk):
+        if isinstance(chunk, bytes):
+            chunk = self._decoder.decode(chunk)
+        self._buffer += chunk
+
+        events = []
+        buf = self._buffer
+        for i in range(self._pos, len(buf)):
+            c = buf[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expect == "key":
+                        self._key = json.loads(buf[self._string_start:i + 1])
+                        self._expect = "colon"
+                continue
+
+            if c.isspace():
+                continue
+
+            # Início de um valor de primeiro nível ou de um item de lista
+            if self._depth == 1 and self._expect == "value":
+                self._value_start = i
+                self._value_is_array = c == "["
+                self._item_index = 0
+                self._expect = "in_value"
+            elif (self._depth == 2 and self._value_is_array and self._expect == "in_value"
+                  and self._item_start is None and c not in ",]"):
+                self._item_start = i
+
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c in "{[":
+                if self._depth == 0:
+                    self._expect = "key"
+                self._depth += 1
+            elif c in "}]":
+                if self._depth == 2 and self._value_is_array and self._item_start is not None:
+                    events.append(self._emit_item(buf, i))
+                self._depth -= 1
+                if self._depth == 0 and self._expect == "in_value":
+                    events.append(self._emit_value(buf, i))
+            elif c == ",":
+                if self._depth == 1 and self._expect == "in_value":
+                    events.append(self._emit_value(buf, i))
+                    self._expect = "key"
+                elif self._depth == 2 and self._value_is_array and self._item_start is not None:
+                    events.append(self._emit_item(buf, i))
+            elif c == ":" and self._depth == 1 and self._expect == "colon":
+                self._expect = "value"
+
+        self._pos = len(buf)
+        return events
+
+    def result(self):
+        """Documento completo, depois que todos os pedaços foram recebidos."""
+        self._buffer += self._decoder.decode(b"", final=True)
+        return json.loads(self._buffer)
+
+    # -----------------------------
+    # SUPORTE
+    # -----------------------------
+
+    def _emit_item(self, buf, end):
+        event = ((self._key, self._item_index), json.loads(buf[self._item_start:end]))
+        self._item_start = None
+        self._item_index += 1
+        return event
+
+    def _emit_value(self, buf, end):
+        event = ((self._key,), json.loads(buf[self._value_start:end]))
+        self._value_start = None
+        self._value_is_array = False
+        return event
+
+
+def iter_events(document):
+    """Gera, para um documento já completo, os mesmos eventos do parser incremental."""
+    for key, value in document.items():
+        if isinstance(value, list):
+            for i, item in enumerate(value):
+                yield (key, i), item
+        yield (key,), value
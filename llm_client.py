@@ -0,0 +1,273 @@
+"""
+Chamadas ao Gemini com prazo, hedging, novas tentativas e circuit breaker.
+
+Cada chamada tem um prazo total (deadline). Se a primeira requisição não
+responder até o percentil configurado da latência recente daquele tipo de
+chamada, uma segunda é disparada (no modelo de fallback, se houver) e vale a
+primeira resposta válida. O hedging é só para latência: um erro ou uma
+resposta inválida não dispara a segunda requisição. Erros transitórios
+(indisponibilidade, limite de cota, timeout) são tentados de novo com espera
+crescente dentro do prazo (no fallback, se houver), respostas inválidas ficam para quem chamou, e
+cada modelo tem um circuit breaker: depois de várias falhas seguidas ele fica
+fora por um tempo e as chamadas vão direto para o fallback.
+
+No streaming o hedging vale até o primeiro pedaço chegar; depois disso a
+resposta segue pela requisição que chegou primeiro.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import metrics
+
+# Nomes das exceções do google.api_core (e afins) que valem nova tentativa
+TRANSIENT_ERRORS = (
+    "ServiceUnavailable", "DeadlineExceeded", "InternalServerError", "TooManyRequests",
+    "ResourceExhausted", "BadGateway", "GatewayTimeout", "RetryError",
+)
+
+
+class CircuitOpen(Exception):
+    def __init__(self, names):
+        super().__init__(f"Gemini indisponível no momento ({', '.join(names)}). Tente novamente em alguns instantes.")
+        self.names = names
+
+
+class LLMTimeout(TimeoutError):
+    def __init__(self, deadline):
+        super().__init__(f"O Gemini não respondeu em {deadline:g}s.")
+        self.deadline = deadline
+
+
+def is_transient(error):
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    return any(cls.__name__ in TRANSIENT_ERRORS for cls in type(error).__mro__)
+
+
+class CircuitBreaker:
+    """
+    closed -> open depois de `failure_threshold` falhas seguidas; open -> half_open
+    depois de `reset_timeout` segundos, liberando uma única chamada de teste.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                metrics.inc("llm_circuit_open_total", model=self.name)
+
+
+class LatencyTracker:
+    """Latências recentes (janela deslizante) de um tipo de chamada."""
+
+    def __init__(self, window=200, min_samples=20):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p):
+        """Percentil p (0-100) das latências recentes, ou None com poucas amostras."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+class _Target:
+    __slots__ = ("role", "name", "model", "breaker")
+
+    def __init__(self, role, model, breaker):
+        self.role = role
+        self.name = breaker.name
+        self.model = model
+        self.breaker = breaker
+
+
+class HedgedClient:
+    """
+    primary / fallback: objetos com a interface do GenerativeModel (generate_content).
+    deadline: prazo total (s) de cada chamada, incluindo novas tentativas.
+    hedge_percentile: percentil da latência recente a partir do qual sai a segunda
+        requisição (None desliga o hedging); hedge_delay é usado até haver amostras.
+    """
+
+    def __init__(self, primary, fallback=None, deadline=60.0, hedge_percentile=95, hedge_delay=10.0,
+                 retries=2, backoff=0.5, failure_threshold=5, reset_timeout=30.0, max_workers=64):
+        def target(role, model):
+            name = str(getattr(model, "model_name", role)).removeprefix("models/")
+            return _Target(role, model, CircuitBreaker(name, failure_threshold, reset_timeout))
+
+        self.primary = target("primary", primary)
+        self.fallback = target("fallback", fallback) if fallback is not None else None
+        self.deadline = deadline
+        self.hedge_percentile = hedge_percentile
+        self.hedge_delay = hedge_delay
+        self.retries = retries
+        self.backoff = backoff
+        self._latency = {}  # tipo de chamada -> LatencyTracker do modelo principal
+        self._latency_lock = threading.Lock()
+        # Requisições abandonadas (perderam a corrida ou estouraram o prazo) terminam aqui em segundo plano
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm")
+
+    def generate(self, kind, prompt, accept=None, **kwargs):
+        """
+        generate_content com prazo, hedging e novas tentativas. accept(response) diz se a
+        resposta é válida; uma inválida só é usada se nenhuma válida chegar.
+        Retorna (resposta, nome do modelo que respondeu).
+        """
+        def call(model, timeout):
+            return model.generate_content(prompt, request_options={"timeout": timeout}, **kwargs)
+        return self._call(kind, call, accept)
+
+    def stream(self, kind, prompt, **kwargs):
+        """
+        generate_content(stream=True): hedging e novas tentativas até o primeiro pedaço.
+        Espera o primeiro pedaço e retorna (pedaços, nome do modelo que respondeu).
+        """
+        def call(model, timeout):
+            chunks = iter(model.generate_content(prompt, stream=True, request_options={"timeout": timeout}, **kwargs))
+            return next(chunks, None), chunks
+
+        def chunks(first, rest):
+            if first is not None:
+                yield first
+            yield from rest
+
+        (first, rest), name = self._call(f"{kind}.stream", call, None)
+        return chunks(first, rest), name
+
+    def hedge_after(self, kind):
+        """Segundos de espera pela primeira requisição antes de disparar a segunda."""
+        if self.hedge_percentile is None:
+            return None
+        observed = self._tracker(kind).percentile(self.hedge_percentile)
+        return self.hedge_delay if observed is None else observed
+
+    # -----------------------------
+    # SUPORTE
+    # -----------------------------
+
+    def _tracker(self, kind):
+        with self._latency_lock:
+            return self._latency.setdefault(kind, LatencyTracker())
+
+    def _call(self, kind, call, accept):
+        deadline = time.monotonic() + self.deadline
+        delay = self.backoff
+        for attempt in range(self.retries + 1):
+            try:
+                return self._race(kind, call, accept, deadline, retry=attempt > 0)
+            except Exception as e:
+                retry = is_transient(e) and not isinstance(e, LLMTimeout)
+                if not retry or attempt == self.retries or time.monotonic() + delay >= deadline:
+                    raise
+                metrics.inc("llm_retries_total", kind=kind, reason=type(e).__name__)
+            time.sleep(delay)
+            delay *= 2
+
+    def _pick(self, *candidates):
+        for target in candidates:
+            if target is not None and target.breaker.allow():
+                return target
+        return None
+
+    def _race(self, kind, call, accept, deadline, retry=False):
+        # A nova tentativa depois de um erro transitório vai para o fallback, se houver
+        first = self._pick(self.fallback, self.primary) if retry else self._pick(self.primary, self.fallback)
+        if first is None:
+            metrics.inc("llm_circuit_rejected_total", kind=kind)
+            raise CircuitOpen([t.name for t in (self.primary, self.fallback) if t is not None])
+
+        start = time.monotonic()
+        hedge_after = self.hedge_after(kind) if first is self.primary else None
+        hedge_at = start + hedge_after if hedge_after is not None else None
+        futures = {self._pool.submit(self._attempt, kind, first, call, deadline): first}
+        errors, rejected, hedged = [], None, False
+
+        while futures:
+            now = time.monotonic()
+            if now >= deadline:
+                metrics.inc("llm_deadline_exceeded_total", kind=kind)
+                raise LLMTimeout(self.deadline)
+            until = deadline if hedge_at is None else min(hedge_at, deadline)
+            done, _ = wait(futures, timeout=max(until - now, 0), return_when=FIRST_COMPLETED)
+
+            start_hedge = not done and hedge_at is not None and time.monotonic() >= hedge_at
+            for future in done:
+                target = futures.pop(future)
+                try:
+                    response = future.result()
+                except Exception as e:
+                    # Erros ficam para as novas tentativas com espera, não para o hedging
+                    errors.append(e)
+                    continue
+                if accept is None or accept(response):
+                    if hedged:
+                        metrics.inc("llm_hedge_wins_total", kind=kind, winner="first" if target is first else "hedge")
+                    return response, target.name
+                metrics.inc("llm_invalid_responses_total", kind=kind, model=target.name)
+                rejected = rejected or (response, target.name)
+
+            if start_hedge:
+                hedge_at = None
+                second = self._pick(self.fallback, self.primary)
+                if second is not None:
+                    hedged = True
+                    metrics.inc("llm_hedges_total", kind=kind, model=second.name)
+                    futures[self._pool.submit(self._attempt, kind, second, call, deadline)] = second
+
+        if rejected is not None:
+            return rejected
+        raise errors[-1]
+
+    def _attempt(self, kind, target, call, deadline):
+        start = time.monotonic()
+        try:
+            response = call(target.model, max(deadline - start, 0.001))
+        except Exception as e:
+            metrics.inc("llm_attempts_total", model=target.name, result="error")
+            if is_transient(e):
+                target.breaker.record_failure()
+            else:
+                # Erro do pedido (ex: argumento inválido), não do serviço: não conta para o circuit breaker
+                target.breaker.record_success()
+            raise
+        elapsed = time.monotonic() - start
+        target.breaker.record_success()
+        metrics.inc("llm_attempts_total", model=target.name, result="ok")
+        if target is self.primary:
+            self._tracker(kind).add(elapsed)
+        return response
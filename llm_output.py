@@ -0,0 +1,273 @@
+"""
+Esquemas das respostas do Gemini (análise do perfil e roadmap), validação e
+reparo local dos defeitos mais comuns.
+
+Os esquemas seguem o formato de response_schema da API do Gemini, então o
+mesmo dicionário vai para o modelo (saída estruturada) e para a validação
+local. parse() tenta, nesta ordem: ler o JSON direto; reparar o texto (bloco
+de código Markdown, texto fora do objeto, vírgulas sobrando, resposta cortada
+no meio); ajustar os campos ao esquema. Os campos de primeiro nível que não
+puderam ser recuperados voltam em `failed`, para o MentorAI pedir só eles de novo.
+"""
+
+import json
+import re
+
+try:
+    import orjson # type:ignore
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+STRING = {"type": "STRING"}
+
+
+def _array(items):
+    return {"type": "ARRAY", "items": items}
+
+
+def _object(*fields, **nested):
+    """Objeto com todos os campos obrigatórios; `fields` são strings, `nested` os demais tipos."""
+    properties = {name: STRING for name in fields}
+    properties.update(nested)
+    return {"type": "OBJECT", "properties": properties, "required": list(properties)}
+
+
+_PLANO = _object(objetivos=_array(STRING), atividades=_array(STRING))
+
+ANALYSIS_SCHEMA = _object(
+    "resumo_geral",
+    forcas_tecnicas=_array(STRING),
+    pontos_melhorar=_array(STRING),
+    sugestoes_curto_prazo=_array(STRING),
+    caminhos_carreira=_array(_object("titulo", "compatibilidade", "desenvolvimento_necessario", "oportunidades")),
+)
+
+ROADMAP_SCHEMA = _object(
+    "meta_carreira",
+    fundamentos_essenciais=_array(STRING),
+    projetos_praticos=_array(_object("titulo", "objetivo", "desenvolve_habilidades")),
+    ferramentas_essenciais=_array(_object("nome", "prioridade", "quando_aprender", "conexao_mercado")),
+    plano_30_dias=_PLANO,
+    plano_60_dias=_PLANO,
+    plano_90_dias=_PLANO,
+    resultado_90_dias_esperado=STRING,
+)
+
+SCHEMAS = {
+    "analysis": ANALYSIS_SCHEMA,
+    "roadmap": ROADMAP_SCHEMA,
+}
+
+# Próximo caractere relevante depois de uma vírgula: se fecha o bloco, a vírgula sobra
+_CLOSING_AFTER = re.compile(r"\s*[}\]]")
+
+# Quantos pontos de corte (vírgulas) testar, de trás para frente, numa resposta cortada
+MAX_CUTS = 32
+
+
+def subschema(schema, fields):
+    """Esquema só com alguns campos de primeiro nível (para pedir de novo só essa parte)."""
+    properties = {name: schema["properties"][name] for name in fields}
+    return {"type": "OBJECT", "properties": properties, "required": list(properties)}
+
+
+def default(schema):
+    kind = schema["type"].upper()
+    if kind == "ARRAY":
+        return []
+    if kind == "OBJECT":
+        return {name: default(sub) for name, sub in schema["properties"].items()}
+    return ""
+
+
+# -----------------------------
+# REPARO DO TEXTO
+# -----------------------------
+
+def repair_text(text):
+    """
+    Reconstrói o objeto JSON a partir de uma resposta com defeito.
+    Retorna (objeto ou None, defeitos encontrados).
+    """
+    defects = []
+    start = text.find("{")
+    if start < 0:
+        return None, ["unparseable"]
+    prefix = text[:start]
+    if "```" in prefix:
+        defects.append("fence")
+    elif prefix.strip():
+        defects.append("extra_text")
+
+    out = []      # texto limpo, caractere a caractere
+    closers = []  # fechamentos pendentes
+    cuts = []     # (tamanho de out antes da vírgula, fechamentos naquele ponto)
+    in_string = escape = False
+    trailing_commas = 0
+    complete = False
+
+    for i in range(start, len(text)):
+        c = text[i]
+        if in_string:
+            out.append(c)
+            if escape:
+                escape = False
+            elif c == "\\":
+                escape = True
+            elif c == '"':
+                in_string = False
+            continue
+
+        if c == '"':
+            in_string = True
+        elif c in "{[":
+            closers.append("}" if c == "{" else "]")
+        elif c in "}]":
+            if not closers or closers[-1] != c:
+                break
+            closers.pop()
+            if not closers:
+                out.append(c)
+                complete = True
+                suffix = text[i + 1:]
+                if "```" not in suffix and suffix.strip() and "extra_text" not in defects:
+                    defects.append("extra_text")
+                break
+        elif c == ",":
+            if _CLOSING_AFTER.match(text, i + 1):
+                trailing_commas += 1
+                continue
+            cuts.append((len(out), "".join(reversed(closers))))
+        out.append(c)
+
+    if trailing_commas:
+        defects.append("trailing_comma")
+
+    if complete:
+        try:
+            return _loads("".join(out)), defects
+        except ValueError:
+            return None, defects + ["unparseable"]
+
+    # Resposta cortada: fecha o que ficou aberto ou volta até a última vírgula que dá um JSON válido.
+    # Um texto cortado no meio é descartado: o item ou campo incompleto sai junto.
+    defects.append("truncated")
+    candidates = [] if in_string else ["".join(out).rstrip().rstrip(",") + "".join(reversed(closers))]
+    candidates += ["".join(out[:size]) + pending for size, pending in reversed(cuts[-MAX_CUTS:])]
+    for candidate in candidates:
+        try:
+            return _loads(candidate), defects
+        except ValueError:
+            continue
+    return None, defects + ["unparseable"]
+
+
+# -----------------------------
+# AJUSTE AO ESQUEMA
+# -----------------------------
+
+def _main_field(schema, value):
+    """Campo do objeto que recebe um valor solto: o primeiro do mesmo tipo (texto ou lista)."""
+    if isinstance(value, list):
+        kind = "ARRAY"
+    elif isinstance(value, (str, int, float, bool)):
+        kind = "STRING"
+    else:
+        return None
+    return next((name for name, sub in schema["properties"].items() if sub["type"].upper() == kind), None)
+
+
+def conform(value, schema, path=()):
+    """
+    Ajusta o valor ao esquema. Retorna (valor, problemas), com problemas como
+    (caminho, defeito). Defeitos "missing_field" e "invalid_type" indicam dado
+    perdido (substituído pelo valor padrão); "coerced" e "invalid_item" não.
+    Um texto ou lista no lugar de um objeto vai para o primeiro campo do mesmo tipo.
+    """
+    kind = schema["type"].upper()
+    problems = []
+
+    if kind == "STRING":
+        if isinstance(value, str):
+            return value, problems
+        if isinstance(value, (int, float, bool)):
+            return str(value), [(path, "coerced")]
+        return "", [(path, "invalid_type")]
+
+    if kind == "ARRAY":
+        if isinstance(value, (str, dict)):
+            value, problems = [value], [(path, "coerced")]
+        elif not isinstance(value, list):
+            return [], [(path, "invalid_type")]
+        items = []
+        for i, item in enumerate(value):
+            if item is None or (isinstance(item, list) and schema["items"]["type"].upper() != "ARRAY"):
+                problems.append((path + (i,), "invalid_item"))
+                continue
+            item, item_problems = conform(item, schema["items"], path + (i,))
+            items.append(item)
+            problems += item_problems
+        return items, problems
+
+    if not isinstance(value, dict):
+        # Valor solto no lugar do objeto (ex: só o título): vai para o campo principal
+        main = _main_field(schema, value)
+        if main is None:
+            return default(schema), [(path, "invalid_type")]
+        result = default(schema)
+        result[main], _ = conform(value, schema["properties"][main], path + (main,))
+        return result, [(path, "coerced")]
+    result = dict(value)
+    for name, sub in schema["properties"].items():
+        if name not in value or value[name] is None:
+            result[name] = default(sub)
+            problems.append((path + (name,), "missing_field"))
+        else:
+            result[name], sub_problems = conform(value[name], sub, path + (name,))
+            problems += sub_problems
+    return result, problems
+
+
+def conform_event(path, value, schema):
+    """
+    Ajusta ao esquema um evento do parser incremental (ver json_stream): o campo
+    de primeiro nível (campo,) ou o item (campo, i) de uma lista. Retorna o evento
+    ajustado, ou None para um item que o ajuste da lista inteira descartaria.
+    """
+    field = schema["properties"].get(path[0])
+    if field is None:
+        return path, value
+    if len(path) == 1:
+        return path, conform(value, field, path)[0]
+    if field["type"].upper() != "ARRAY":
+        return None
+    items, _ = conform([value], field, path[:1])
+    return (path, items[0]) if items else None
+
+
+LOST = ("missing_field", "invalid_type", "unparseable")
+
+
+def parse(text, schema):
+    """
+    Lê a resposta do modelo e a ajusta ao esquema.
+    Retorna (documento, defeitos, campos de primeiro nível que falharam).
+    O documento sempre tem todos os campos; os que falharam ficam com o valor padrão.
+    """
+    try:
+        data, defects = _loads(text), []
+    except ValueError:
+        data, defects = repair_text(text)
+
+    if not isinstance(data, dict):
+        fields = list(schema["properties"])
+        return default(schema), sorted(set(defects)) or ["unparseable"], fields
+
+    document, problems = conform(data, schema)
+    failed = []
+    for path, defect in problems:
+        defects.append(defect)
+        if defect in LOST and path[0] not in failed:
+            failed.append(path[0])
+    return document, sorted(set(defects)), failed
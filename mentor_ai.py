@@ -1,41 +1,330 @@
-import google.generativeai as genai # type:ignore
 import os
-from dotenv import load_dotenv, find_dotenv # type:ignore
+import hashlib
 import json
+import re
+import threading
+import unicodedata
+import llm_output
+import metrics
+from llm_client import HedgedClient
+from json_stream import IncrementalJSONParser, iter_events
 
-# Tava com problema para localizar o .env, esses print da para tirar se quiser
-env_file = find_dotenv()
-if not env_file:
-    print("⚠️ AVISO: Arquivo .env não encontrado!")
-else:
-    print(f"✅ Arquivo .env encontrado em: {env_file}")
+# A configuração (.env + Gemini) só acontece na primeira chamada, não no import
+_env_loaded = False
+_genai = None
+_config_lock = threading.Lock()
 
-load_dotenv(env_file)
 
-# 2. Pega a chave e VERIFICA se ela veio
-api_key = os.getenv("GEMINI_API_KEY")
+def load_environment():
+    """Carrega o .env uma única vez."""
+    global _env_loaded
+    if _env_loaded:
+        return
+    from dotenv import load_dotenv, find_dotenv # type:ignore
 
-if not api_key:
-    raise ValueError("❌ ERRO FATAL: A variável 'GEMINI_API_KEY' está vazia ou não existe no .env")
+    # Tava com problema para localizar o .env, esses print da para tirar se quiser
+    env_file = find_dotenv()
+    if not env_file:
+        print("⚠️ AVISO: Arquivo .env não encontrado!")
+    else:
+        print(f"✅ Arquivo .env encontrado em: {env_file}")
+
+    load_dotenv(env_file)
+    _env_loaded = True
+
+
+def get_genai():
+    """Importa e configura o google.generativeai na primeira vez que for usado."""
+    global _genai
+    with _config_lock:
+        if _genai is not None:
+            return _genai
+
+        load_environment()
+
+        # 2. Pega a chave e VERIFICA se ela veio
+        api_key = os.getenv("GEMINI_API_KEY")
+
+        if not api_key:
+            raise ValueError("❌ ERRO FATAL: A variável 'GEMINI_API_KEY' está vazia ou não existe no .env")
+
+        import google.generativeai as genai # type:ignore
+
+        print("🔑 Chave carregada com sucesso. Configurando Gemini...")
+        genai.configure(api_key=api_key)
+        _genai = genai
+        return _genai
+
+# Versão de cada template de prompt: ao mudar um prompt, incremente para invalidar o cache
+PROMPT_VERSIONS = {
+    "analysis": 5,
+    "roadmap": 2,
+}
+
+# Largura (pontos) das faixas de percentil enviadas ao Gemini e usadas na chave do cache
+PERCENTILE_BAND = 10
+
+
+def normalize_goal(goal):
+    """Normaliza o objetivo para o cache: sem acentos, minúsculo e com espaços simples."""
+    text = unicodedata.normalize("NFKD", goal)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r"\s+", " ", text).strip().lower()
 
-print("🔑 Chave carregada com sucesso. Configurando Gemini...")
-genai.configure(api_key=api_key)
 
 # =========================================================================
 # CLASSE MENTORAI
 # =========================================================================
 
 class MentorAI:
-    def __init__(self):
+    def __init__(self, cache=None, model=None, section_retries=1, fallback=None, client=None):
         self.generation_config_json = {
             "response_mime_type": "application/json",
         }
+        # Quantas vezes pedir de novo só os campos que vieram inválidos mesmo após o reparo local
+        self.section_retries = section_retries
         # Modelo que estou usando: gemini-2.5-flash
-        self.model = genai.GenerativeModel(
-            "gemini-2.5-flash",
-            generation_config=self.generation_config_json
+        self.model_name = "gemini-2.5-flash"
+        # Criados só na primeira chamada (ou injetados, ex: modelos falsos em benchmarks).
+        # fallback é o modelo mais leve usado no hedging e com o circuit breaker aberto.
+        self._model = model
+        self._fallback = fallback
+        self._client = client
+        self._model_lock = threading.Lock()
+        # DiskCache opcional com as respostas já geradas (chave: modelo + versão do prompt + entrada)
+        self.cache = cache
+
+    @property
+    def client(self):
+        with self._model_lock:
+            if self._client is None:
+                self._client = self._build_client()
+            return self._client
+
+    def _build_client(self):
+        """
+        Configuração pelo .env:
+          GEMINI_FALLBACK_MODEL    modelo mais leve para o hedging (ex: gemini-2.5-flash-lite)
+          GEMINI_DEADLINE          prazo de cada chamada em segundos (padrão 60)
+          GEMINI_HEDGE_PERCENTILE  percentil da latência recente que dispara a 2ª requisição (padrão 95, "off" desliga)
+        """
+        def build(name):
+            return get_genai().GenerativeModel(name, generation_config=self.generation_config_json)
+
+        # build() passa por get_genai, que já carrega o .env
+        model = self._model or build(self.model_name)
+        fallback_name = os.getenv("GEMINI_FALLBACK_MODEL")
+        fallback = self._fallback or (build(fallback_name) if fallback_name else None)
+        percentile = os.getenv("GEMINI_HEDGE_PERCENTILE", "95").strip().lower()
+        return HedgedClient(
+            model,
+            fallback,
+            deadline=float(os.getenv("GEMINI_DEADLINE", "60")),
+            hedge_percentile=None if percentile in ("", "off", "0") else float(percentile),
         )
-    def analyze_profile(self, profile_summary):
+
+    def _cache_key(self, kind, normalized_input):
+        raw = f"{self.model_name}|{kind}|v{PROMPT_VERSIONS[kind]}|{normalized_input}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _store(self, key, result, failed, answered):
+        """
+        Guarda a resposta no cache. Resposta incompleta não vai para o cache, nem a que veio
+        (mesmo em parte) do modelo de fallback: a chave é a do modelo principal.
+        """
+        if self.cache is not None and not failed and answered <= {self.client.primary.name}:
+            self.cache.set(key, result)
+
+    def _record_usage(self, kind, prompt, text, usage):
+        """Contadores de tamanho do prompt e da resposta (bytes e, se o Gemini informar, tokens)."""
+        metrics.inc("llm_requests_total", kind=kind)
+        metrics.inc("llm_prompt_bytes_total", len(prompt.encode("utf-8")), kind=kind)
+        metrics.inc("llm_response_bytes_total", len(text.encode("utf-8")), kind=kind)
+        if usage is not None:
+            metrics.inc("llm_prompt_tokens_total", getattr(usage, "prompt_token_count", 0) or 0, kind=kind)
+            metrics.inc("llm_response_tokens_total", getattr(usage, "candidates_token_count", 0) or 0, kind=kind)
+
+    def _cached(self, kind, key, bypass_cache):
+        if self.cache is None or bypass_cache:
+            return None
+        cached = self.cache.get(key)
+        metrics.inc("llm_cache_total", kind=kind, result="miss" if cached is None else "hit")
+        return cached
+
+    def _generation_config(self, schema):
+        # O esquema vai junto em cada chamada: análise e roadmap usam o mesmo modelo
+        return {**self.generation_config_json, "response_schema": schema}
+
+    def _validated(self, kind, prompt, text, answered):
+        """
+        Valida a resposta contra o esquema, com reparo local dos defeitos comuns.
+        Os campos que ainda assim falharem são pedidos de novo ao modelo, só eles.
+        Os modelos que responderam os pedidos de novo entram em `answered`.
+        Retorna (documento, campos que continuaram inválidos).
+        """
+        schema = llm_output.SCHEMAS[kind]
+        result, defects, failed = llm_output.parse(text, schema)
+        for defect in defects:
+            metrics.inc("llm_output_defects_total", kind=kind, defect=defect)
+
+        retried = False
+        for _ in range(self.section_retries):
+            if not failed:
+                break
+            retried = True
+            for field in failed:
+                metrics.inc("llm_section_retries_total", kind=kind, section=field)
+            section_prompt = self._section_prompt(prompt, failed)
+            with metrics.span(f"mentor.{kind}.retry"):
+                response, model = self.client.generate(
+                    f"{kind}.section",
+                    section_prompt,
+                    generation_config=self._generation_config(llm_output.subschema(schema, failed)),
+                )
+            answered.add(model)
+            self._record_usage(kind, section_prompt, response.text, getattr(response, "usage_metadata", None))
+            part, _, still_failed = llm_output.parse(response.text, llm_output.subschema(schema, failed))
+            result.update({field: part[field] for field in failed if field not in still_failed})
+            failed = still_failed
+
+        if failed:
+            outcome = "failed"
+        elif retried:
+            outcome = "retried"
+        else:
+            outcome = "repaired" if defects else "valid"
+        metrics.inc("llm_outputs_total", kind=kind, result=outcome)
+        return result, failed
+
+    def _section_prompt(self, prompt, fields):
+        names = ", ".join(f"'{field}'" for field in fields)
+        return f"""{prompt}
+
+ATENÇÃO: gere SOMENTE um objeto JSON com os campos {names}, seguindo a mesma
+estrutura e as mesmas regras acima. Não inclua nenhum outro campo.
+"""
+
+    def _generate_json(self, kind, normalized_input, prompt, bypass_cache=False):
+        """Chama o Gemini e devolve o JSON, reaproveitando respostas do cache quando possível."""
+        key = self._cache_key(kind, normalized_input)
+        cached = self._cached(kind, key, bypass_cache)
+        if cached is not None:
+            return cached
+
+        # CHAMADA À API GEMINI:
+        # com prazo e hedging; vale a primeira resposta que passar na validação
+        schema = llm_output.SCHEMAS[kind]
+        with metrics.span(f"mentor.{kind}"):
+            response, model = self.client.generate(
+                kind,
+                prompt,
+                accept=lambda r: not llm_output.parse(r.text, schema)[2],
+                generation_config=self._generation_config(schema),
+            )
+        self._record_usage(kind, prompt, response.text, getattr(response, "usage_metadata", None))
+        answered = {model}
+        result, failed = self._validated(kind, prompt, response.text, answered)
+
+        # Com bypass a resposta nova substitui a anterior
+        self._store(key, result, failed, answered)
+        return result
+
+    def _stream_json(self, kind, normalized_input, prompt, bypass_cache=False):
+        """
+        Versão em streaming de _generate_json: gera os eventos (caminho, valor)
+        de cada campo assim que ele termina de chegar e retorna o documento completo.
+        """
+        key = self._cache_key(kind, normalized_input)
+        cached = self._cached(kind, key, bypass_cache)
+        if cached is not None:
+            yield from iter_events(cached)
+            return cached
+
+        schema = llm_output.SCHEMAS[kind]
+        parser = IncrementalJSONParser()
+        received = []
+        usage = None
+        with metrics.span(f"mentor.{kind}"):
+            stream, model = self.client.stream(kind, prompt, generation_config=self._generation_config(schema))
+            for chunk in stream:
+                received.append(chunk.text)
+                # O uso de tokens vem completo no último pedaço
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                if parser is not None:
+                    try:
+                        events = parser.feed(chunk.text)
+                    except ValueError:
+                        # Campo malformado: para os eventos parciais e deixa o reparo para o fim
+                        parser = None
+                        continue
+                    # Os eventos parciais passam pelo mesmo ajuste ao esquema que o documento final
+                    for path, value in events:
+                        event = llm_output.conform_event(path, value, schema)
+                        if event is not None:
+                            yield event
+        text = "".join(received)
+        self._record_usage(kind, prompt, text, usage)
+        # O documento final (validado e reparado) substitui o que foi exibido em streaming
+        answered = {model}
+        result, failed = self._validated(kind, prompt, text, answered)
+
+        self._store(key, result, failed, answered)
+        return result
+
+    def prewarm_roadmaps(self, goals):
+        """Gera antecipadamente os roadmaps dos objetivos mais comuns que ainda não estão no cache."""
+        for goal in goals:
+            if goal.strip():
+                self.generate_roadmap(goal)
+
+    @staticmethod
+    def _profile_for_ai(profile_summary):
+        """
+        Perfil como vai para o prompt e para a chave do cache: os percentis em faixas de
+        PERCENTILE_BAND pontos. Os valores exatos mudam a cada perfil novo na distribuição e
+        fariam a mesma análise nunca ser reaproveitada; com faixas, a análise do cache não
+        cita um número diferente do que foi enviado.
+        """
+        percentiles = profile_summary.get("percentiles")
+        if not percentiles:
+            return profile_summary
+        bands = {
+            metric: None if value is None else int(min(value, 99.9) // PERCENTILE_BAND * PERCENTILE_BAND)
+            for metric, value in percentiles.items()
+        }
+        return {**profile_summary, "percentiles": bands}
+
+    @staticmethod
+    def _profile_cache_input(summary):
+        return json.dumps(summary, sort_keys=True, ensure_ascii=False, default=str)
+
+    def analyze_profile(self, profile_summary, bypass_cache=False):
+        summary = self._profile_for_ai(profile_summary)
+        prompt = self._analysis_prompt(summary)
+        return self._generate_json("analysis", self._profile_cache_input(summary), prompt, bypass_cache)
+
+    def stream_profile(self, profile_summary, bypass_cache=False):
+        """Como analyze_profile, mas entrega cada campo assim que ele é gerado."""
+        summary = self._profile_for_ai(profile_summary)
+        prompt = self._analysis_prompt(summary)
+        return (yield from self._stream_json(
+            "analysis", self._profile_cache_input(summary), prompt, bypass_cache
+        ))
+
+    def generate_roadmap(self, goal, bypass_cache=False):
+        prompt = self._roadmap_prompt(goal)
+        return self._generate_json("roadmap", normalize_goal(goal), prompt, bypass_cache)
+
+    def stream_roadmap(self, goal, bypass_cache=False):
+        """Como generate_roadmap, mas entrega cada campo assim que ele é gerado."""
+        prompt = self._roadmap_prompt(goal)
+        return (yield from self._stream_json("roadmap", normalize_goal(goal), prompt, bypass_cache))
+
+    # -----------------------------
+    # PROMPTS
+    # -----------------------------
+
+    def _analysis_prompt(self, profile_summary):
         # Estou forçando a IA a me retornar o arquivo em formato JSON para facilitar na formatação no streamlit
         json_schema_analysis = """
 {
@@ -99,15 +388,22 @@ Para cada caminho inclua:
 - Documentação ou tecnologias para estudar
 - Pequenos desafios semanais de prática
 
+Se o perfil trouxer o campo 'percentiles', ele indica a faixa de percentil de cada nota em
+relação aos outros desenvolvedores já analisados (ex: 80 = entre os percentis 80 e 90); use isso
+para contextualizar o nível, sem citar percentis exatos.
+
+O campo 'activity_metrics' detalha a atividade semanal de commits: médias e fração de semanas
+ativas nas últimas 4, 12 e 52 semanas, a maior média móvel de 4 semanas, a sequência atual e a
+mais longa de semanas com commits e a tendência recente (commits/semana ganhos ou perdidos por semana).
+Use esses dados para comentar constância e evolução, sem repetir os números crus.
+
 Agora avalie o seguinte perfil:
 Perfil:
 {profile_summary}
 """
-        # CHAMADA À API GEMINI:
-        response = self.model.generate_content(prompt)
-        return json.loads(response.text) # Retorna um dicionário Python
+        return prompt
 
-    def generate_roadmap(self, goal):
+    def _roadmap_prompt(self, goal):
         
         json_schema_roadmap = """
 {
@@ -179,6 +475,4 @@ O conteúdo do JSON deve ser gerado seguindo os seguintes requisitos:
 - Nível de proficiência
 - Possíveis próximos passos na carreira
 """
-        # CHAMADA À API GEMINI:
-        response = self.model.generate_content(prompt)
-        return json.loads(response.text) 
\ No newline at end of file
+        return prompt
\ No newline at end of file
@@ -0,0 +1,203 @@
+"""
+Instrumentação leve: spans de tempo e contadores, exportados no formato texto
+do Prometheus. Um Trace opcional guarda o detalhamento de uma única análise
+(usado no app para mostrar onde o tempo foi gasto).
+"""
+
+import contextvars
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PREFIX = "mentor"
+
+_current_trace = contextvars.ContextVar("mentor_trace", default=None)
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}   # (nome, labels) -> valor
+        self._summaries = {}  # (nome, labels) -> [quantidade, soma]
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            summary = self._summaries.setdefault(key, [0, 0.0])
+            summary[0] += 1
+            summary[1] += value
+
+    def render(self):
+        """Texto no formato de exposição do Prometheus."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            summaries = sorted(self._summaries.items())
+
+        lines = []
+        declared = set()
+        for (name, labels), value in counters:
+            full = f"{PREFIX}_{name}"
+            if full not in declared:
+                lines.append(f"# TYPE {full} counter")
+                declared.add(full)
+            lines.append(f"{full}{_labels(labels)} {value}")
+        for (name, labels), (count, total) in summaries:
+            full = f"{PREFIX}_{name}"
+            if full not in declared:
+                lines.append(f"# TYPE {full} summary")
+                declared.add(full)
+            lines.append(f"{full}_count{_labels(labels)} {count}")
+            lines.append(f"{full}_sum{_labels(labels)} {total:.6f}")
+        return "\n".join(lines) + "\n"
+
+    def counters(self, name):
+        """Valores atuais do contador `name`, por conjunto de labels ({(("label", valor), ...): total})."""
+        with self._lock:
+            return {labels: value for (key, labels), value in self._counters.items() if key == name}
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._summaries.clear()
+
+
+class Trace:
+    """Tempos de cada span de uma única execução, agregados por nome."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._spans = {}  # nome -> [quantidade, soma, primeiro início]
+        self.started = time.perf_counter()
+
+    def add(self, name, start, duration):
+        with self._lock:
+            span = self._spans.setdefault(name, [0, 0.0, start])
+            span[0] += 1
+            span[1] += duration
+
+    def breakdown(self):
+        """Lista de {etapa, chamadas, total_s, início_s}, na ordem em que cada etapa começou."""
+        with self._lock:
+            items = sorted(self._spans.items(), key=lambda item: item[1][2])
+        return [
+            {"etapa": name, "chamadas": count, "total_s": round(total, 3), "início_s": round(first - self.started, 3)}
+            for name, (count, total, first) in items
+        ]
+
+
+registry = Registry()
+
+
+def _escape(value):
+    # Formato texto do Prometheus: só \, " e quebra de linha precisam de escape
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+    return "{" + body + "}"
+
+
+# -----------------------------
+# API PÚBLICA
+# -----------------------------
+
+def inc(name, value=1, **labels):
+    registry.inc(name, value, **labels)
+
+
+@contextmanager
+def span(name):
+    """Mede o bloco: vai para o resumo global e para o Trace atual, se houver."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        registry.observe("span_seconds", duration, span=name)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add(name, start, duration)
+
+
+def timed(name):
+    """Decorator equivalente a envolver a função inteira em span(name)."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def trace():
+    """Abre um Trace para a execução atual (e para as threads que usarem bind)."""
+    current = Trace()
+    token = _current_trace.set(current)
+    try:
+        yield current
+    finally:
+        _current_trace.reset(token)
+
+
+def bind(fn):
+    """Leva o Trace atual para fn quando ela rodar em outra thread (pools)."""
+    current = _current_trace.get()
+    if current is None:
+        return fn
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = _current_trace.set(current)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current_trace.reset(token)
+    return wrapper
+
+
+def render_prometheus():
+    return registry.render()
+
+
+def write_prometheus(path):
+    """Grava as métricas em arquivo (ex: para o textfile collector do node_exporter)."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(render_prometheus())
+    os.replace(tmp, path)
+
+
+def serve(port, host="127.0.0.1"):
+    """Sobe um endpoint /metrics em uma thread de fundo (só local, a menos que host diga outro)."""
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = render_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
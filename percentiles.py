@@ -0,0 +1,103 @@
+import json
+import os
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+METRICS = ("final_score", "language_score", "activity_score", "project_score")
+
+
+class PercentileIndex:
+    """
+    Distribuição das notas de todos os perfis já analisados.
+    Cada métrica é mantida como uma lista ordenada (consulta por busca binária)
+    e cada nova análise é acrescentada sem reconstruir o índice. Com uma chave
+    (ex: o usuário do GitHub), a nova análise substitui a anterior da mesma
+    chave, então cada pessoa entra uma vez só na distribuição. Com um path,
+    as notas também são gravadas em um arquivo JSONL e recarregadas na próxima vez.
+    """
+
+    def __init__(self, path=None, metrics=METRICS):
+        self.path = path
+        self.metrics = tuple(metrics)
+        self._values = {m: [] for m in self.metrics}
+        self._rows = {}  # chave -> notas atuais daquela chave
+        self._lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            anonymous, lines = [], 0
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        lines += 1
+                        row = json.loads(line)
+                        key = row.pop("key", None)
+                        if key is None:
+                            anonymous.append(row)
+                        else:
+                            # A linha mais recente de cada chave é a que vale
+                            self._rows.pop(key, None)
+                            self._rows[key] = row
+            for row in anonymous + list(self._rows.values()):
+                for m in self.metrics:
+                    if m in row:
+                        self._values[m].append(row[m])
+            for values in self._values.values():
+                values.sort()
+            if lines > len(anonymous) + len(self._rows):
+                # Reescreve o arquivo sem as linhas substituídas
+                self._rewrite(anonymous)
+
+    def __len__(self):
+        return len(self._values[self.metrics[0]])
+
+    def add(self, scores, key=None):
+        """Acrescenta as notas de uma análise à distribuição (substituindo as anteriores da mesma chave)."""
+        row = {m: float(scores[m]) for m in self.metrics if m in scores}
+        with self._lock:
+            if key is not None:
+                previous = self._rows.pop(key, None)
+                if previous is not None:
+                    for m, value in previous.items():
+                        values = self._values[m]
+                        del values[bisect_left(values, value)]
+                self._rows[key] = row
+            for m, value in row.items():
+                insort(self._values[m], value)
+            if self.path:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(row if key is None else {"key": key, **row}) + "\n")
+
+    def percentile(self, metric, value, key=None):
+        """
+        Percentil (0-100) de value entre as notas registradas; None se ainda não há dados.
+        Com key, as notas já registradas para essa chave ficam de fora da comparação.
+        """
+        with self._lock:
+            values = self._values[metric]
+            total = len(values)
+            below = bisect_left(values, value)
+            equal = bisect_right(values, value) - below
+            own = self._rows.get(key, {}).get(metric) if key is not None else None
+            if own is not None:
+                total -= 1
+                if own < value:
+                    below -= 1
+                elif own == value:
+                    equal -= 1
+            if not total:
+                return None
+            return round((below + 0.5 * equal) / total * 100, 1)
+
+    def percentiles(self, scores, key=None):
+        return {m: self.percentile(m, scores[m], key) for m in self.metrics if m in scores}
+
+    def _rewrite(self, anonymous):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for row in anonymous:
+                f.write(json.dumps(row) + "\n")
+            for key, row in self._rows.items():
+                f.write(json.dumps({"key": key, **row}) + "\n")
+        os.replace(tmp, self.path)
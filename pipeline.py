@@ -0,0 +1,76 @@
+import inspect
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+
+
+class Pipeline:
+    """
+    Pequeno executor de etapas com grafo de dependências.
+    Cada etapa começa assim que as etapas de que depende terminam, e as
+    independentes rodam em paralelo. run() entrega (nome, evento, valor) na
+    ordem em que as coisas acontecem:
+      ("etapa", "partial", item)     -> item gerado por uma etapa que é um gerador
+      ("etapa", "done", resultado)   -> etapa terminada
+    """
+
+    def __init__(self, max_workers=4):
+        self.max_workers = max_workers
+        self.stages = {}
+
+    def add(self, name, fn, deps=()):
+        """Registra uma etapa; fn recebe os resultados de deps, na mesma ordem."""
+        for dep in deps:
+            if dep not in self.stages:
+                raise ValueError(f"Etapa '{name}' depende de '{dep}', que não foi registrada")
+        self.stages[name] = (fn, tuple(deps))
+        return self
+
+    def run(self):
+        results = {}
+        waiting = dict(self.stages)
+        events = queue.Queue()
+        running = 0
+
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            def submit_ready():
+                nonlocal running
+                for name, (fn, deps) in list(waiting.items()):
+                    if all(dep in results for dep in deps):
+                        del waiting[name]
+                        args = [results[dep] for dep in deps]
+                        pool.submit(metrics.bind(self._execute), name, fn, args, events)
+                        running += 1
+
+            submit_ready()
+            while running:
+                name, event, value = events.get()
+                if event == "error":
+                    # Uma falha interrompe o pipeline e sobe para o chamador
+                    raise value
+                if event == "done":
+                    running -= 1
+                    results[name] = value
+                    submit_ready()
+                yield name, event, value
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _execute(self, name, fn, args, events):
+        try:
+            with metrics.span(f"stage.{name}"):
+                result = fn(*args)
+                # Etapas geradoras publicam resultados parciais; o valor de retorno é o resultado final
+                if inspect.isgenerator(result):
+                    generator = result
+                    while True:
+                        try:
+                            events.put((name, "partial", next(generator)))
+                        except StopIteration as stop:
+                            result = stop.value
+                            break
+            events.put((name, "done", result))
+        except Exception as e:
+            events.put((name, "error", e))
@@ -0,0 +1,148 @@
+import threading
+import time
+
+
+class RateLimitExceeded(Exception):
+    """A cota da API acabou e a espera necessária passa do limite aceito pelo chamador."""
+
+    def __init__(self, wait):
+        self.wait = wait
+        super().__init__(f"Limite de requisições do GitHub atingido. Tente novamente em {int(wait) + 1}s.")
+
+
+class RateLimitScheduler:
+    """
+    Agendador de requisições compartilhado por todos os coletores do processo.
+    Combina um token bucket (ritmo local) com a cota informada pelo GitHub nos
+    headers X-RateLimit-Remaining / X-RateLimit-Reset e Retry-After.
+
+    Cada API do GitHub (REST "core", "graphql"...) tem cota e renovação próprias, então
+    cada uma tem o seu agendador; respostas de outra cota (X-RateLimit-Resource) são ignoradas.
+    """
+
+    def __init__(self, rate=10.0, burst=100, max_wait=60, resource=None):
+        self.resource = resource  # cota acompanhada (None = a de qualquer resposta)
+        self.rate = rate          # tokens por segundo
+        self.burst = burst        # capacidade do balde
+        self.max_wait = max_wait  # espera máxima (s) antes de desistir com RateLimitExceeded
+
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+        # Estado informado pelo GitHub
+        self.remaining = None       # requisições restantes na janela atual, descontadas as em andamento
+        self.reported = None        # menor X-RateLimit-Remaining visto na janela atual
+        self.in_flight = 0          # requisições liberadas por acquire() ainda sem resposta
+        self.reset_at = None        # epoch em que a cota é renovada
+        self.blocked_until = 0.0    # epoch até quando o Retry-After pede para esperar
+
+    # -----------------------------
+    # API PÚBLICA
+    # -----------------------------
+
+    def expected_wait(self):
+        """Quanto tempo (s) uma nova requisição precisaria esperar agora."""
+        with self._lock:
+            self._refill()
+            return self._wait_locked()
+
+    def acquire(self, max_wait=None):
+        """Bloqueia até a requisição poder sair; levanta RateLimitExceeded se a espera for longa demais."""
+        max_wait = self.max_wait if max_wait is None else max_wait
+        while True:
+            with self._lock:
+                self._refill()
+                wait = self._wait_locked()
+                if wait <= 0:
+                    self._tokens -= 1
+                    self.in_flight += 1
+                    # Reserva a cota para que requisições simultâneas não passem do limite
+                    if self.remaining is not None:
+                        self.remaining -= 1
+                    return
+            if wait > max_wait:
+                raise RateLimitExceeded(wait)
+            time.sleep(wait)
+
+    def update(self, status_code, headers):
+        """Atualiza a cota a partir dos headers de uma resposta."""
+        now = time.time()
+        with self._lock:
+            self._finish_locked()
+            resource = headers.get("X-RateLimit-Resource")
+            if resource is not None and self.resource is not None and resource != self.resource:
+                self._reconcile_locked()
+                return
+            remaining = headers.get("X-RateLimit-Remaining")
+            reset = headers.get("X-RateLimit-Reset")
+            if reset is not None and float(reset) != self.reset_at:
+                # Nova janela: a cota informada substitui a anterior
+                self.reset_at = float(reset)
+                self.reported = None
+                self.remaining = None
+            if remaining is not None:
+                # A cota informada já desconta esta resposta; as reservas que continuam valendo são as das
+                # requisições ainda em andamento. Respostas que não gastam cota (ex: 304) devolvem a reserva,
+                # e uma resposta atrasada (com Remaining maior) não desfaz as que já foram contadas.
+                reported = int(remaining)
+                self.reported = reported if self.reported is None else min(self.reported, reported)
+                self._reconcile_locked()
+
+            retry_after = headers.get("Retry-After")
+            if retry_after is not None:
+                self.blocked_until = max(self.blocked_until, now + float(retry_after))
+            elif self.is_rate_limited(status_code, headers) and self.reset_at:
+                self.blocked_until = max(self.blocked_until, self.reset_at)
+
+    def release(self):
+        """Devolve a reserva de uma requisição que falhou sem resposta (ex: erro de conexão)."""
+        with self._lock:
+            self._finish_locked()
+            self._reconcile_locked()
+
+    def is_rate_limited(self, status_code, headers):
+        """Indica se a resposta foi recusada por limite de requisições."""
+        if status_code == 429:
+            return True
+        return status_code == 403 and (
+            headers.get("Retry-After") is not None or headers.get("X-RateLimit-Remaining") == "0"
+        )
+
+    # -----------------------------
+    # SUPORTE
+    # -----------------------------
+
+    def _finish_locked(self):
+        if self.in_flight:
+            self.in_flight -= 1
+
+    def _reconcile_locked(self):
+        if self.reported is not None:
+            self.remaining = max(self.reported - self.in_flight, 0)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def _wait_locked(self):
+        now = time.time()
+        waits = [self.blocked_until - now]
+        if self.remaining is not None and self.remaining <= 0 and self.reset_at:
+            waits.append(self.reset_at - now)
+        if self._tokens < 1:
+            waits.append((1 - self._tokens) / self.rate)
+        return max(0.0, *waits)
+
+
+_schedulers = {}
+_default_lock = threading.Lock()
+
+
+def get_scheduler(resource="core"):
+    """Agendador único do processo para a cota `resource` ("core" = API REST, "graphql"), compartilhado entre sessões."""
+    with _default_lock:
+        if resource not in _schedulers:
+            _schedulers[resource] = RateLimitScheduler(resource=resource)
+        return _schedulers[resource]
@@ -0,0 +1,203 @@
+"""
+HTML das seções de resultado (análise do perfil e roadmap).
+
+Os templates são compilados uma vez, no import, e cada seção vira uma única
+string: o app a escreve com um só st.markdown, em vez de dezenas de chamadas.
+As funções aceitam dados parciais (os campos que ainda não chegaram do Gemini
+ficam de fora), então servem tanto para o streaming quanto para o resultado final.
+"""
+
+import re
+from html import escape
+from string import Template
+
+# As linhas não podem ser indentadas nem ter linhas em branco no meio:
+# o Markdown trataria o HTML como bloco de código ou encerraria o bloco.
+
+FEEDBACK = Template(
+    "<h2>🧠 Análise do Mentor IA</h2>\n"
+    "<div class='json-card'><h3>📌 Resumo Geral do Perfil</h3>$resumo</div>\n"
+    "<div class='card-cols'>"
+    "<div class='json-card'><h3>💡 Forças Técnicas</h3>$forcas</div>"
+    "<div class='json-card'><h3>⚠️ Pontos a Melhorar</h3>$pontos</div>"
+    "</div>\n"
+    "<div class='json-card'><h3>🚀 Sugestões de Curto Prazo (7-30 dias)</h3>$sugestoes</div>\n"
+    "<h3>🎯 Possíveis Caminhos de Carreira</h3>$caminhos\n"
+    "<hr>"
+)
+
+ROADMAP = Template(
+    "<h2>🗺️ Roadmap Personalizado</h2>\n"
+    "<div class='json-card' style='background-color:#e6f3ff; border-left: 5px solid #007bff;'>"
+    "<h3>✅ Fundamentos Essenciais</h3>$fundamentos</div>\n"
+    "<div class='json-card'><h3>🛠️ Ferramentas, Linguagens e Frameworks Essenciais</h3>$ferramentas</div>\n"
+    "<div class='json-card' style='background-color:#fff8e1; border-left: 5px solid #ffc107;'>"
+    "<h3>🏗️ Projetos Práticos Obrigatórios</h3>$projetos</div>\n"
+    "<div class='json-card'><h3>🗓️ Plano de Evolução</h3><div class='card-cols'>$planos</div></div>\n"
+    "<div class='json-card' style='background-color:#f8f9fa; border-left: 5px solid #6c757d;'>"
+    "<h3>🏆 Resultado Final Esperado (90 Dias)</h3>$resultado</div>"
+)
+
+ITEM = Template("<div class='card-item $kind'>$icon $text</div>")
+
+CAMINHO = Template(
+    "<details class='card-details'><summary><b>$titulo</b> - Compatibilidade: $compatibilidade</summary>"
+    "<p><b>O que precisa ser desenvolvido:</b> $desenvolvimento</p>"
+    "<p><b>Oportunidades no Mercado:</b> $oportunidades</p></details>"
+)
+
+FERRAMENTA = Template("<tr><td>$nome</td><td>$prioridade</td><td>$quando</td><td>$conexao</td></tr>")
+
+TABELA = Template(
+    "<table class='card-table'><thead><tr><th>Nome</th><th>Prioridade</th><th>Quando Aprender</th>"
+    "<th>Conexão Mercado</th></tr></thead><tbody>$linhas</tbody></table>"
+)
+
+PROJETO = Template(
+    "<p><b>$numero. $titulo</b></p>"
+    "<p><i>Objetivo:</i> $objetivo</p>"
+    "<p><i>Desenvolve Habilidades:</i> $habilidades</p>"
+)
+
+PLANO = Template(
+    "<div class='plan-card' style='background-color: $fundo; border-left: 5px solid $borda;'>"
+    "<p><b>$dias</b></p>$objetivos$atividades</div>"
+)
+
+PLANOS = (
+    ("plano_30_dias", "📅 30 Dias", "#e8f5e8", "#28a745"),
+    ("plano_60_dias", "📅 60 Dias", "#fff3cd", "#ffc107"),
+    ("plano_90_dias", "📅 90 Dias", "#d1ecf1", "#17a2b8"),
+)
+
+
+# Markdown mínimo do texto do modelo, aplicado depois do escape (o HTML cru
+# desliga o Markdown do Streamlit): código inline, negrito, itálico e listas.
+_CODE = re.compile(r"`([^`\n]+)`")
+_BOLD = re.compile(r"\*\*(?=\S)(.+?)(?<=\S)\*\*|(?<!\w)__(?=\S)(.+?)(?<=\S)__(?!\w)")
+_ITALIC = re.compile(r"(?<!\*)\*(?=[^\s*])(.+?)(?<=[^\s*])\*(?!\*)|(?<!\w)_(?=[^\s_])(.+?)(?<=[^\s_])_(?!\w)")
+_BULLET = re.compile(r"^[ \t]*[-*][ \t]+", re.MULTILINE)
+
+
+def _inline(text):
+    text = _BOLD.sub(lambda m: f"<b>{m.group(1) or m.group(2)}</b>", text)
+    return _ITALIC.sub(lambda m: f"<i>{m.group(1) or m.group(2)}</i>", text)
+
+
+def _markdown(text):
+    text = _BULLET.sub("• ", text.strip())
+    # Trechos de código ficam de fora do negrito/itálico (ex: `__init__`)
+    parts = _CODE.split(text)
+    html = "".join(f"<code>{part}</code>" if i % 2 else _inline(part) for i, part in enumerate(parts))
+    # Linha em branco encerraria o bloco HTML no Markdown do Streamlit
+    return re.sub(r"\s*\n\s*", "<br>", html)
+
+
+def _text(value, default=""):
+    if value is None or value == "":
+        return escape(default)
+    return _markdown(escape(str(value)))
+
+
+def _list(value):
+    """Lista esperada; um valor solto (ex: resposta parcial fora do esquema) vira lista de um item."""
+    if isinstance(value, list):
+        return value
+    return [value] if value else []
+
+
+def _record(value, field):
+    """Objeto esperado; um valor solto (ex: só o título) vira o campo principal do objeto."""
+    if isinstance(value, dict):
+        return value
+    return {field: value} if value else {}
+
+
+def _items(values, kind, icon):
+    return "".join(ITEM.substitute(kind=kind, icon=icon, text=_text(v)) for v in _list(values))
+
+
+def _bullets(title, values):
+    values = _list(values)
+    if not values:
+        return ""
+    return f"<p><b>{title}</b></p>" + "".join(f"<p>• {_text(v)}</p>" for v in values)
+
+
+def feedback_html(data, final=False):
+    """Seção da análise do perfil. final=True preenche as mensagens de campo ausente."""
+    resumo = data.get("resumo_geral")
+    if not resumo and final:
+        resumo = "Resumo não encontrado."
+
+    caminhos = "".join(
+        CAMINHO.substitute(
+            titulo=_text(caminho.get("titulo"), f"Caminho {i + 1}"),
+            compatibilidade=_text(caminho.get("compatibilidade"), "Nível não especificado"),
+            desenvolvimento=_text(caminho.get("desenvolvimento_necessario"), "N/A"),
+            oportunidades=_text(caminho.get("oportunidades"), "N/A"),
+        )
+        for i, caminho in enumerate(_record(c, "titulo") for c in _list(data.get("caminhos_carreira")))
+    )
+
+    return FEEDBACK.substitute(
+        resumo=f"<p>{_text(resumo)}</p>" if resumo else "",
+        forcas=_items(data.get("forcas_tecnicas"), "success", "✅"),
+        pontos=_items(data.get("pontos_melhorar"), "warning", "❗"),
+        sugestoes=_items(data.get("sugestoes_curto_prazo"), "info", "👉"),
+        caminhos=caminhos,
+    )
+
+
+def roadmap_html(data, final=False):
+    """Seção do roadmap. final=True preenche as mensagens de campo ausente."""
+    ferramentas = [_record(f, "nome") for f in _list(data.get("ferramentas_essenciais"))]
+    if ferramentas:
+        tabela = TABELA.substitute(linhas="".join(
+            FERRAMENTA.substitute(
+                nome=_text(f.get("nome")),
+                prioridade=_text(f.get("prioridade")),
+                quando=_text(f.get("quando_aprender")),
+                conexao=_text(f.get("conexao_mercado")),
+            )
+            for f in ferramentas
+        ))
+    elif final:
+        tabela = ITEM.substitute(kind="info", icon="", text="Nenhuma ferramenta essencial especificada.")
+    else:
+        tabela = ""
+
+    projetos = "<hr>".join(
+        PROJETO.substitute(
+            numero=i + 1,
+            titulo=_text(projeto.get("titulo"), "Projeto Sem Nome"),
+            objetivo=_text(projeto.get("objetivo"), "N/A"),
+            habilidades=_text(projeto.get("desenvolve_habilidades"), "N/A"),
+        )
+        for i, projeto in enumerate(_record(p, "titulo") for p in _list(data.get("projetos_praticos")))
+    )
+
+    planos = "".join(
+        PLANO.substitute(
+            fundo=fundo,
+            borda=borda,
+            dias=dias,
+            objetivos=_bullets("🎯 Objetivos Chave:", plano.get("objetivos")),
+            atividades=_bullets("📚 Atividades:", plano.get("atividades")),
+        )
+        for campo, dias, fundo, borda in PLANOS
+        for plano in [_record(data.get(campo), "objetivos")]
+        if plano
+    )
+
+    resultado = data.get("resultado_90_dias_esperado")
+    if not resultado and final:
+        resultado = "Resultado final não especificado."
+
+    return ROADMAP.substitute(
+        fundamentos="".join(f"<p>• <b>{_text(f)}</b></p>" for f in _list(data.get("fundamentos_essenciais"))),
+        ferramentas=tabela,
+        projetos=projetos,
+        planos=planos,
+        resultado=ITEM.substitute(kind="info", icon="", text=_text(resultado)) if resultado else "",
+    )
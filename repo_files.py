@@ -0,0 +1,50 @@
+"""
+Detecção de README, testes e CI a partir dos caminhos da árvore git de um repo.
+"""
+
+import re
+
+# README na raiz (ou nas pastas que o GitHub também exibe como README do repo)
+README = re.compile(r"^(\.github/|docs/)?readme(\.[a-z0-9]+)?$")
+
+# Pastas de teste em qualquer nível, ou arquivos no padrão dos frameworks mais comuns
+TEST_DIR = re.compile(r"(^|/)(tests?|__tests__|specs?|testing)(/|$)")
+TEST_FILE = re.compile(
+    r"(^|/)(test_[^/]*\.py|[^/]*_test\.(py|go|rb|exs?|rs)|[^/]*\.(test|spec)\.[cm]?[jt]sx?"
+    r"|[^/]*tests?\.(java|kt|cs|php|swift)|[^/]*_spec\.rb)$"
+)
+
+CI = re.compile(
+    r"^(\.github/workflows/[^/]+\.ya?ml|\.gitlab-ci\.ya?ml|\.travis\.ya?ml|\.circleci/config\.ya?ml"
+    r"|jenkinsfile|azure-pipelines\.ya?ml|\.drone\.ya?ml|bitbucket-pipelines\.ya?ml|\.woodpecker\.ya?ml)$"
+)
+
+NO_FILES = {"has_readme": False, "has_tests": False, "has_ci": False}
+
+
+def detect(paths):
+    """Recebe os caminhos (arquivos e pastas) e diz se o repo tem README, testes e CI."""
+    found = dict(NO_FILES)
+    for path in paths:
+        path = path.lower()
+        if not found["has_readme"] and README.match(path):
+            found["has_readme"] = True
+        if not found["has_tests"] and (TEST_DIR.search(path) or TEST_FILE.search(path)):
+            found["has_tests"] = True
+        if not found["has_ci"] and CI.match(path):
+            found["has_ci"] = True
+        if all(found.values()):
+            break
+    return found
+
+
+def summarize_tree(body):
+    """
+    Reduz a resposta de git/trees ao SHA da árvore e ao que foi detectado.
+    Aceita também um resumo já feito (é o que fica guardado no HTTPCache).
+    """
+    if isinstance(body, dict) and "has_readme" in body:
+        return body
+    if not isinstance(body, dict) or "tree" not in body:
+        return {"sha": None, **NO_FILES}
+    return {"sha": body.get("sha"), **detect(entry["path"] for entry in body["tree"])}
@@ -0,0 +1,17 @@
+import argparse
+import sys
+from pathlib import Path
+
+import pytest
+
+# Os módulos do app ficam na raiz do repositório, fora de um pacote
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def bench_args():
+    """Argumentos de benchmarks/run.py para rodar um cenário pequeno nos testes."""
+    def build(**kwargs):
+        defaults = {"iterations": 1, "latency": 0.0, "llm_delay": 0.05, "profiles": 2000}
+        return argparse.Namespace(**{**defaults, **kwargs})
+    return build
@@ -0,0 +1,7 @@
+from benchmarks import run
+
+
+def test_analyze_many_matches_analyze(bench_args):
+    # Mesmo resultado, campo a campo, que o analyze perfil a perfil
+    result = run.analyze(bench_args())
+    assert result["analyze_many[2000 profiles]"]["mismatches_first_2000"] == 0
@@ -0,0 +1,70 @@
+import threading
+import time
+
+import pytest
+
+import batch
+
+
+class Probe:
+    """Conta quantas chamadas de uma etapa rodam ao mesmo tempo."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, value):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(self.seconds)
+        with self._lock:
+            self.running -= 1
+        return value
+
+
+@pytest.fixture
+def runner(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    def build(**kwargs):
+        runner = batch.BatchRunner(str(tmp_path / "out.jsonl"), **kwargs)
+        collect = Probe(0.05)
+        runner.collect = lambda username: collect({"username": username, "analysis": {}})
+        return runner, collect
+    return build
+
+
+def test_collect_concurrency_is_independent_of_llm_workers(runner):
+    batch_runner, collect = runner(collect_workers=32, llm_workers=2, skip_ai=True)
+    batch_runner.run([f"user-{i}" for i in range(64)])
+    assert collect.peak == 32
+    assert len(batch_runner.completed_users()) == 64
+
+
+def test_ai_backlog_is_bounded(runner, monkeypatch):
+    monkeypatch.setattr(batch, "MentorAI", lambda **kwargs: None)
+    batch_runner, collect = runner(collect_workers=8, llm_workers=1)
+    # Perfis entre o início da coleta e o fim da etapa de IA
+    outstanding = Probe(0)
+    collected = batch_runner.collect
+
+    def start(username):
+        with outstanding._lock:
+            outstanding.running += 1
+            outstanding.peak = max(outstanding.peak, outstanding.running)
+        return collected(username)
+
+    def advise(row):
+        time.sleep(0.02)
+        batch_runner.write(dict(row, status="ok"))
+        with outstanding._lock:
+            outstanding.running -= 1
+
+    batch_runner.collect, batch_runner.advise = start, advise
+    batch_runner.run([f"user-{i}" for i in range(40)])
+    assert collect.peak == 8
+    assert outstanding.peak <= 8 + 4
+    assert len(batch_runner.completed_users()) == 40
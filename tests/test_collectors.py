@@ -0,0 +1,43 @@
+import pytest
+
+from benchmarks.fake_github import FakeGitHub
+from github_collector import GitHubCollector
+from github_graphql_collector import GitHubGraphQLCollector
+from rate_limiter import RateLimitScheduler
+
+
+@pytest.fixture(scope="module")
+def github():
+    with FakeGitHub() as server:
+        yield server
+
+
+def collect(collector_class, github, username, **kwargs):
+    scheduler = RateLimitScheduler(rate=1e9, burst=1e9)
+    return collector_class(username, scheduler=scheduler, **kwargs).collect_profile_data()
+
+
+@pytest.mark.parametrize("username", ["bench-5", "bench-130"])
+def test_graphql_matches_rest(github, username):
+    rest = collect(GitHubCollector, github, username, api_url=github.url)
+    graphql = collect(GitHubGraphQLCollector, github, username, token="t", api_url=f"{github.url}/graphql")
+
+    assert set(graphql) == set(rest)
+    assert graphql["languages"] == rest["languages"]
+    by_name = sorted(rest["repos"], key=lambda r: r["name"])
+    assert sorted(graphql["repos"], key=lambda r: r["name"]) == by_name
+    # A atividade vem de fontes diferentes (calendário x commits por repo), mas cobre as mesmas semanas
+    assert len(graphql["activity"]) == len(rest["activity"])
+    assert graphql["activity_start"] == rest["activity_start"]
+    assert graphql["pending_repos"] == rest["pending_repos"] == []
+
+
+def test_request_count_per_profile(github):
+    github.reset_counters()
+    collector = GitHubCollector("bench-130", api_url=github.url, scheduler=RateLimitScheduler(rate=1e9, burst=1e9))
+    collector.collect_profile_data()
+    collector.get_languages()
+
+    # 2 páginas da lista (100 + 30) e, por repo, uma chamada de atividade e uma da árvore
+    assert collector.request_count == 2 + 130 + 130
+    assert github.requests_by_kind == {"repos": 2, "commit_activity": 130, "tree": 130}
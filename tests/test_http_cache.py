@@ -0,0 +1,42 @@
+import pytest
+
+from benchmarks.fake_github import FakeGitHub
+from cache import HTTPCache
+from github_collector import GitHubCollector
+from rate_limiter import RateLimitScheduler
+
+# bench-5: 1 página da lista + 5 atividades + 5 árvores
+REQUESTS = 11
+
+
+@pytest.fixture
+def github():
+    with FakeGitHub() as server:
+        yield server
+
+
+def collect(github, cache):
+    collector = GitHubCollector("bench-5", api_url=github.url, cache=cache,
+                                scheduler=RateLimitScheduler(rate=1e9, burst=1e9))
+    return collector.collect_profile_data()
+
+
+def test_fresh_entries_are_served_without_requests(github, tmp_path):
+    cache = HTTPCache(tmp_path, ttl=300)
+    expected = collect(github, cache)
+    assert cache.stats() == {"hits": 0, "misses": REQUESTS, "revalidations": 0, "entries": REQUESTS}
+
+    github.reset_counters()
+    assert collect(github, cache) == expected
+    assert github.requests == 0
+    assert cache.stats()["hits"] == REQUESTS
+
+
+def test_stale_entries_are_revalidated_with_304(github, tmp_path):
+    cache = HTTPCache(tmp_path, ttl=0)
+    expected = collect(github, cache)
+
+    github.reset_counters()
+    assert collect(github, cache) == expected
+    assert github.requests == REQUESTS
+    assert cache.stats() == {"hits": 0, "misses": REQUESTS, "revalidations": REQUESTS, "entries": REQUESTS}
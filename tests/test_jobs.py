@@ -0,0 +1,82 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from jobs import JobQueue, JobQueueFull
+
+
+class Gate:
+    """Pipeline de teste: publica um evento e só termina quando release() é chamado."""
+
+    def __init__(self):
+        self.builds = 0
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+
+    def __call__(self, username, goal):
+        with self._lock:
+            self.builds += 1
+        return self
+
+    def run(self):
+        yield "collect", "done", {"ok": True}
+        self.release.wait(5)
+        yield "feedback", "done", {}
+
+
+@pytest.fixture
+def gate():
+    gate = Gate()
+    yield gate
+    gate.release.set()
+
+
+def test_identical_requests_share_one_job(gate):
+    queue = JobQueue(gate, max_workers=2)
+    requests = [("Octocat", "Backend Python"), (" octocat ", "backend  python"), ("OCTOCAT", "Backend Pythón")] * 10
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        ids = set(pool.map(lambda request: queue.submit(*request), requests))
+
+    assert len(ids) == 1
+    assert gate.builds == 1
+    assert queue.stats()["coalesced"] == len(requests) - 1
+
+    # Outro objetivo é outro job
+    assert queue.submit("octocat", "Frontend") not in ids
+
+    gate.release.set()
+    job = queue.get(ids.pop())
+    events, cursor = job.wait(0, timeout=5)
+    while not job.finished:
+        more, cursor = job.wait(cursor, timeout=5)
+        events += more
+    assert job.status == "done"
+    assert [stage for stage, _, _ in events] == ["collect", "feedback"]
+    queue.shutdown()
+
+
+def test_finished_jobs_leave_the_single_flight(gate):
+    gate.release.set()
+    queue = JobQueue(gate, max_workers=1)
+    first = queue.get(queue.submit("octocat", "Backend"))
+    cursor = 0
+    while not first.finished:
+        _, cursor = first.wait(cursor, timeout=5)
+
+    # Terminado o job, um pedido igual roda de novo
+    assert queue.submit("octocat", "Backend") != first.id
+    queue.shutdown()
+    assert gate.builds == 2
+
+
+def test_queue_limit(gate):
+    queue = JobQueue(gate, max_workers=1, max_pending=2)
+    queue.submit("a", "x")
+    queue.submit("b", "x")
+    with pytest.raises(JobQueueFull):
+        queue.submit("c", "x")
+    # Pedido igual a um job em andamento não ocupa vaga
+    queue.submit("a", "x")
+    gate.release.set()
+    queue.shutdown()
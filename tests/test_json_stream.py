@@ -0,0 +1,20 @@
+import json
+
+from benchmarks import run
+from benchmarks.fake_gemini import ANALYSIS
+from json_stream import IncrementalJSONParser, iter_events
+
+
+def test_stream_parser_handles_arbitrary_splits(bench_args):
+    # 200 documentos cortados em pontos aleatórios, em texto e em bytes
+    (result,) = run.stream_parser(bench_args()).values()
+    assert result["failures"] == 0
+
+
+def test_every_byte_split_gives_the_same_events():
+    data = json.dumps(ANALYSIS, ensure_ascii=False).encode("utf-8")
+    expected = list(iter_events(ANALYSIS))
+    for cut in range(1, len(data)):
+        parser = IncrementalJSONParser()
+        events = parser.feed(data[:cut]) + parser.feed(data[cut:])
+        assert events == expected, cut
@@ -0,0 +1,73 @@
+import time
+
+from benchmarks.fake_gemini import FakeModel, heavy_tail
+from llm_client import HedgedClient
+from mentor_ai import MentorAI
+
+
+class ServiceUnavailable(Exception):
+    pass
+
+
+class Model:
+    """Modelo de teste: devolve (ou levanta) os resultados da fila, um por chamada."""
+
+    def __init__(self, name, *results, delay=0.0):
+        self.model_name = name
+        self.results = list(results)
+        self.delay = delay
+        self.calls = 0
+
+    def generate_content(self, prompt, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        result = self.results.pop(0) if len(self.results) > 1 else self.results[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def client(primary, fallback=None, **kwargs):
+    return HedgedClient(primary, fallback, deadline=5, hedge_delay=0.05, backoff=0.01, **kwargs)
+
+
+def test_fast_error_is_retried_without_hedging():
+    primary = Model("primary", ServiceUnavailable(), "ok")
+    assert client(primary, retries=2).generate("t", "p") == ("ok", "primary")
+    assert primary.calls == 2
+
+
+def test_retry_goes_to_the_fallback():
+    primary = Model("primary", ServiceUnavailable())
+    fallback = Model("fallback", "leve")
+    assert client(primary, fallback).generate("t", "p") == ("leve", "fallback")
+    assert (primary.calls, fallback.calls) == (1, 1)
+
+
+def test_invalid_response_does_not_hedge():
+    primary = Model("primary", "inválida")
+    fallback = Model("fallback", "ok")
+    response = client(primary, fallback).generate("t", "p", accept=lambda r: r == "ok")
+    assert response == ("inválida", "primary")
+    assert fallback.calls == 0
+
+
+def test_slow_response_is_hedged():
+    primary = Model("primary", "lenta", delay=0.5)
+    fallback = Model("fallback", "rápida")
+    assert client(primary, fallback).generate("t", "p") == ("rápida", "fallback")
+
+
+def test_no_errors_under_injected_faults():
+    # Travamentos, 503 e respostas com defeito no modelo principal; fallback mais leve
+    median = 0.01
+    primary = FakeModel(delay=heavy_tail(median, stall_rate=0.03, stall=50 * median), failure_rate=0.03,
+                        defect_rate=0.3, seed=7, model_name="primary")
+    light = FakeModel(delay=heavy_tail(0.6 * median, sigma=0.3), failure_rate=0.01, seed=8, model_name="light")
+    client = HedgedClient(primary, light, deadline=25 * median, hedge_delay=3 * median, backoff=median)
+    ai = MentorAI(client=client)
+    for i in range(100):
+        assert ai.generate_roadmap(f"objetivo {i}")["meta_carreira"]
+        assert ai.analyze_profile({"username": f"user-{i}"})["resumo_geral"]
+    assert primary.failures > 0
+    assert primary.injected
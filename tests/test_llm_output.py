@@ -0,0 +1,37 @@
+from benchmarks.fake_gemini import FakeModel
+from llm_client import HedgedClient
+from llm_output import ANALYSIS_SCHEMA, ROADMAP_SCHEMA, conform_event
+from mentor_ai import MentorAI
+import render
+
+
+def test_conform_event_applies_the_field_schema():
+    # Texto ou lista no lugar do objeto vai para o campo principal, sem perder o que o modelo escreveu
+    assert conform_event(("caminhos_carreira", 0), "Backend", ANALYSIS_SCHEMA) == (
+        ("caminhos_carreira", 0),
+        {"titulo": "Backend", "compatibilidade": "", "desenvolvimento_necessario": "", "oportunidades": ""},
+    )
+    path, plano = conform_event(("plano_30_dias",), ["Estudar SQL"], ROADMAP_SCHEMA)
+    assert plano == {"objetivos": ["Estudar SQL"], "atividades": []}
+    path, projeto = conform_event(("projetos_praticos", 0), 3, ROADMAP_SCHEMA)
+    assert projeto["titulo"] == "3"
+    assert conform_event(("resumo_geral", 0), "x", ANALYSIS_SCHEMA) is None
+    assert conform_event(("forcas_tecnicas", 0), None, ANALYSIS_SCHEMA) is None
+
+
+def test_streamed_events_follow_the_schema():
+    roadmap = dict(FakeModel().roadmap, plano_30_dias=["Estudar SQL"], projetos_praticos=["API REST"])
+    model = FakeModel(delay=0, roadmap=roadmap)
+    ai = MentorAI(client=HedgedClient(model, hedge_percentile=None), section_retries=0)
+    data = {}
+    for path, value in ai.stream_roadmap("Backend"):
+        if len(path) == 1:
+            data[path[0]] = value
+            assert isinstance(value, type(render_default(path[0])))
+        render.roadmap_html(data)
+    assert data["plano_30_dias"] == {"objetivos": ["Estudar SQL"], "atividades": []}
+    assert data["projetos_praticos"] == [{"titulo": "API REST", "objetivo": "", "desenvolve_habilidades": ""}]
+
+
+def render_default(field):
+    return {"STRING": "", "ARRAY": [], "OBJECT": {}}[ROADMAP_SCHEMA["properties"][field]["type"]]
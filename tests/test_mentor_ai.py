@@ -0,0 +1,44 @@
+from benchmarks.fake_gemini import FakeModel
+from cache import DiskCache
+from llm_client import HedgedClient
+from mentor_ai import MentorAI
+
+
+def mentor(tmp_path, primary, fallback):
+    client = HedgedClient(primary, fallback, deadline=5, hedge_percentile=None, backoff=0.001)
+    return MentorAI(cache=DiskCache(tmp_path), client=client)
+
+
+def test_fallback_answers_are_not_cached_under_the_primary_model(tmp_path):
+    down = FakeModel(delay=0, failure_rate=1.0, model_name="gemini-2.5-flash")
+    lite = FakeModel(delay=0, model_name="gemini-2.5-flash-lite")
+    ai = mentor(tmp_path, down, lite)
+    assert ai.generate_roadmap("Backend")["meta_carreira"]
+    list(ai.stream_profile({"username": "octocat"}))
+    assert lite.calls == 2
+    assert len(ai.cache) == 0
+
+
+def test_primary_answers_are_cached(tmp_path):
+    primary = FakeModel(delay=0, model_name="gemini-2.5-flash")
+    ai = mentor(tmp_path, primary, FakeModel(delay=0, model_name="gemini-2.5-flash-lite"))
+    ai.generate_roadmap("Backend")
+    ai.generate_roadmap("backend ")
+    list(ai.stream_profile({"username": "octocat"}))
+    assert primary.calls == 2
+    assert len(ai.cache) == 2
+
+
+def test_cached_analysis_matches_the_percentile_band(tmp_path):
+    primary = FakeModel(delay=0, model_name="gemini-2.5-flash")
+    prompts = []
+    generate = primary.generate_content
+    primary.generate_content = lambda prompt, **kwargs: prompts.append(prompt) or generate(prompt, **kwargs)
+    ai = mentor(tmp_path, primary, None)
+
+    for overall in (81.5, 88.0, 92.0):
+        ai.analyze_profile({"username": "octocat", "percentiles": {"overall": overall}})
+    # 81.5 e 88 caem na mesma faixa (80): uma chamada; 92 é outra faixa
+    assert primary.calls == 2
+    assert "'overall': 80" in prompts[0] and "81.5" not in prompts[0]
+    assert "'overall': 90" in prompts[1]
@@ -0,0 +1,21 @@
+import urllib.request
+
+import metrics
+
+
+def test_label_values_are_escaped_for_the_text_format():
+    registry = metrics.Registry()
+    registry.inc("test_escape_total", path='C:\\tmp\n"x"')
+    assert 'test_escape_total{path="C:\\\\tmp\\n\\"x\\""} 1' in registry.render()
+
+
+def test_serve_listens_only_on_localhost_by_default():
+    server = metrics.serve(0)
+    try:
+        assert server.server_address[0] == "127.0.0.1"
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+            assert response.status == 200
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,85 @@
+import time
+
+import pytest
+
+from benchmarks import run
+from rate_limiter import RateLimitExceeded, RateLimitScheduler, get_scheduler
+
+
+def headers(remaining, reset, resource="core"):
+    return {"X-RateLimit-Remaining": str(remaining), "X-RateLimit-Reset": str(reset), "X-RateLimit-Resource": resource}
+
+
+def test_responses_without_quota_cost_give_the_reservation_back():
+    # 304 (ETag) não gasta cota: o servidor continua informando 50 restantes
+    scheduler = RateLimitScheduler(rate=1e9, burst=1e9, max_wait=0)
+    reset = int(time.time()) + 3600
+    for _ in range(200):
+        scheduler.acquire()
+        scheduler.update(304, headers(50, reset))
+    assert scheduler.remaining == 50
+    assert scheduler.in_flight == 0
+
+
+def test_in_flight_requests_stay_reserved():
+    scheduler = RateLimitScheduler(rate=1e9, burst=1e9, max_wait=0)
+    reset = int(time.time()) + 3600
+    scheduler.acquire()
+    scheduler.update(200, headers(3, reset))
+    for _ in range(3):
+        scheduler.acquire()
+    with pytest.raises(RateLimitExceeded):
+        scheduler.acquire()
+
+    # Uma resposta atrasada, com Remaining maior, não libera cota que já foi gasta
+    scheduler.update(200, headers(2, reset))
+    scheduler.update(200, headers(3, reset))
+    assert scheduler.remaining == 1
+    scheduler.update(200, headers(1, reset))
+    assert scheduler.in_flight == 0
+    assert scheduler.remaining == 1
+
+
+def test_failed_requests_release_their_reservation():
+    scheduler = RateLimitScheduler(rate=1e9, burst=1e9, max_wait=0)
+    reset = int(time.time()) + 3600
+    scheduler.acquire()
+    scheduler.update(200, headers(1, reset))
+    scheduler.acquire()
+    assert scheduler.remaining == 0
+    scheduler.release()
+    assert scheduler.remaining == 1
+    scheduler.acquire()
+
+
+def test_new_window_replaces_the_quota():
+    scheduler = RateLimitScheduler(rate=1e9, burst=1e9, max_wait=0)
+    now = int(time.time())
+    scheduler.acquire()
+    scheduler.update(200, headers(0, now + 3600))
+    scheduler.update(200, headers(10, now + 7200))
+    assert scheduler.remaining == 10
+
+
+def test_each_api_has_its_own_quota():
+    assert get_scheduler("core") is get_scheduler("core")
+    assert get_scheduler("core") is not get_scheduler("graphql")
+
+    scheduler = RateLimitScheduler(rate=1e9, burst=1e9, max_wait=0, resource="core")
+    now = int(time.time())
+    for i in range(10):
+        scheduler.acquire()
+        # Respostas da cota GraphQL (outra janela) não mexem na cota REST
+        if i % 2:
+            scheduler.update(200, headers(4000 - i, now + 3600, "core"))
+        else:
+            scheduler.update(200, headers(10, now + 60, "graphql"))
+    assert scheduler.reset_at == now + 3600
+    assert scheduler.remaining == 4000 - 9
+    assert scheduler.in_flight == 0
+
+
+def test_shared_scheduler_avoids_403s(bench_args):
+    # Três coletas seguidas contra uma cota de 40 requisições a cada 2s
+    (result,) = run.rate_limit(bench_args()).values()
+    assert result["rejected_403"] == 0
@@ -0,0 +1,27 @@
+import render
+
+
+def test_feedback_tolerates_items_outside_the_schema():
+    html = render.feedback_html({"caminhos_carreira": ["Backend", None], "forcas_tecnicas": "Python"})
+    assert "Backend" in html
+    assert "Python" in html
+
+
+def test_roadmap_tolerates_items_outside_the_schema():
+    html = render.roadmap_html({
+        "plano_30_dias": ["Estudar SQL"],
+        "ferramentas_essenciais": ["Docker"],
+        "projetos_praticos": "API REST",
+        "fundamentos_essenciais": "Git",
+    }, final=True)
+    for text in ("Estudar SQL", "Docker", "API REST", "Git"):
+        assert text in html
+
+
+def test_model_markdown_becomes_html_after_escaping():
+    html = render.feedback_html({"resumo_geral": "Domina **Python** e *pytest*; veja `__init__`.\n- <script>x</script>"})
+    assert "<b>Python</b>" in html
+    assert "<i>pytest</i>" in html
+    assert "<code>__init__</code>" in html
+    assert "<br>• &lt;script&gt;x&lt;/script&gt;" in html
+    assert "<script>" not in html
@@ -0,0 +1,59 @@
+import pytest
+
+from benchmarks.fake_github import FakeGitHub
+from cache import DiskCache
+from github_collector import GitHubCollector
+from http_transport import Transport
+from rate_limiter import RateLimitScheduler
+
+
+@pytest.fixture
+def github():
+    with FakeGitHub() as server:
+        yield server
+
+
+def collect(github, username, snapshots=None):
+    collector = GitHubCollector(username, api_url=github.url, snapshots=snapshots, stats_deadline=0,
+                                scheduler=RateLimitScheduler(rate=1e9, burst=1e9),
+                                transport=Transport(retries=0))
+    return collector.collect_profile_data(), collector.request_count
+
+
+@pytest.mark.parametrize("status", [502, 403, 451])
+def test_failed_requests_do_not_enter_the_snapshot(github, tmp_path, status):
+    expected, _ = collect(github, "bench-5")
+    names = [repo["name"] for repo in expected["repos"]]
+
+    snapshots = DiskCache(tmp_path)
+    github.fail("bench-5", names[:2], status)
+    partial, _ = collect(github, "bench-5", snapshots)
+    assert partial["pending_repos"] == names[:2]
+
+    # Com a API de volta, os repos que falharam são buscados de novo (atividade + árvore)
+    github.fail("bench-5", names[:2], None)
+    data, requests = collect(github, "bench-5", snapshots)
+    assert requests == 1 + 2 * 2
+    assert data == expected
+
+    data, requests = collect(github, "bench-5", snapshots)
+    assert requests == 1
+    assert data == expected
+
+
+def test_failed_refresh_keeps_the_previous_entry(github, tmp_path):
+    snapshots = DiskCache(tmp_path)
+    expected, _ = collect(github, "bench-5", snapshots)
+    names = [repo["name"] for repo in expected["repos"]]
+
+    github.push("bench-5", [0])
+    github.fail("bench-5", names[:1])
+    data, _ = collect(github, "bench-5", snapshots)
+    assert data["pending_repos"] == names[:1]
+    assert data["repos"] == expected["repos"]
+    assert sum(data["activity"]) == sum(expected["activity"])
+
+    github.fail("bench-5", names[:1], None)
+    data, requests = collect(github, "bench-5", snapshots)
+    assert requests == 1 + 2
+    assert data["pending_repos"] == []